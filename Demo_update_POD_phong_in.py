@@ -1,7 +1,6 @@
 import openpyxl
 import re
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
+from google_clients import get_clients
 import os
 
 # Nhập thông tin PART và ngày DATE
@@ -13,11 +12,7 @@ print(f"PART: {PART} \nDATE: {DATE} \nFolder: {FOLDER_PATH}")
 
 # Hàm kết nối Google Sheet bằng ID
 def connect_to_google_sheet_by_id(json_keyfile, sheet_id, sheet_name):
-    scope = ['https://spreadsheets.google.com/feeds', 'https://www.googleapis.com/auth/drive']
-    credentials = ServiceAccountCredentials.from_json_keyfile_name(json_keyfile, scope)
-    client = gspread.authorize(credentials)
-    spreadsheet = client.open_by_key(sheet_id)
-    return spreadsheet
+    return get_clients(json_keyfile).spreadsheet(sheet_id)
 
 # Ánh xạ dữ liệu từ file Excel
 def extract_data_from_excel(file_path):
@@ -2,8 +2,7 @@ import fitz
 import pytesseract as tess
 import os
 import time
-import gspread
-from google.oauth2.service_account import Credentials
+from google_clients import get_clients
 
 # Cấu hình Tesseract
 tess.pytesseract.tesseract_cmd = r"D:\Project\Tesseract-OCR\tesseract.exe"
@@ -69,18 +68,8 @@ def setup_google_sheets(json_keyfile_path, sheet_url):
     Kết nối với Google Sheets
     """
     try:
-        # Định nghĩa scope
-        scope = [
-            "https://spreadsheets.google.com/feeds",
-            "https://www.googleapis.com/auth/drive"
-        ]
-
-        # Xác thực
-        creds = Credentials.from_service_account_file(json_keyfile_path, scopes=scope)
-        client = gspread.authorize(creds)
-
-        # Mở sheet
-        sheet = client.open_by_url(sheet_url).sheet1  # Hoặc .worksheet('Sheet1')
+        # Xác thực và mở sheet qua client dùng chung
+        sheet = get_clients(json_keyfile_path).spreadsheet(sheet_url).sheet1  # Hoặc .worksheet('Sheet1')
 
         return sheet
     except Exception as e:
@@ -1,10 +1,11 @@
 from fastapi import FastAPI, File, UploadFile, HTTPException, BackgroundTasks
+from starlette.concurrency import run_in_threadpool
 # from fastapi.responses import JSONResponse
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
+from google_clients import get_clients
+from sheet_uploader import SheetUploader
+from sheet_values import sheet_values
 import pandas as pd
 import os
-import json
 import shutil
 import datetime
 from typing import List
@@ -20,41 +21,34 @@ CREDENTIALS_FILE = 'decent-trail-451507-d7-d59973874d84.json'
 SPREADSHEET_KEY = '1kNMeY5JrRbvocmYktfWOoWJUamW6W8AQNATDgjgtGW0'
 PROCESSED_FOLDER = "uploaded_files"
 
+# Ghi theo từng khối song song, khối lỗi được gửi lại riêng
+uploader = SheetUploader()
+
 # Đảm bảo thư mục processed tồn tại
 if not os.path.exists(PROCESSED_FOLDER):
     os.makedirs(PROCESSED_FOLDER)
 
 
 def get_gspread_client():
-    """Khởi tạo và trả về client gspread đã được xác thực"""
+    """Trả về client gspread dùng chung, chỉ xác thực một lần cho mọi request"""
     try:
-        creds = ServiceAccountCredentials.from_json_keyfile_name(CREDENTIALS_FILE, SCOPE)
-        client = gspread.authorize(creds)
-        return client
+        return get_clients(CREDENTIALS_FILE, SCOPE).gspread()
     except Exception as e:
         raise Exception(f"Không thể kết nối với Google Sheets: {str(e)}")
 
 
-def convert_to_json_compliant(value):
-    """Chuyển đổi giá trị để tương thích với JSON"""
-    if pd.isna(value):
-        return ""
-    if isinstance(value, float) and (value == float('inf') or value == float('-inf')):
-        return str(value)
+def get_spreadsheet():
+    """Trả về spreadsheet đã mở sẵn, dùng lại giữa các request"""
     try:
-        json.dumps(value)
-        return value
-    except (OverflowError, ValueError):
-        return str(value) if isinstance(value, float) else value
+        return get_clients(CREDENTIALS_FILE, SCOPE).spreadsheet(SPREADSHEET_KEY)
+    except Exception as e:
+        raise Exception(f"Không thể kết nối với Google Sheets: {str(e)}")
 
 
 async def process_file(file_path: str, original_filename: str):
     """Xử lý file và cập nhật lên Google Sheets"""
     try:
         filename = original_filename.lower()
-        client = get_gspread_client()
-        spreadsheet = client.open_by_key(SPREADSHEET_KEY)
-
         # Đọc file dựa vào định dạng
         df = None
         if filename.endswith('.xlsx'):
@@ -83,18 +77,15 @@ async def process_file(file_path: str, original_filename: str):
             except KeyError as e:
                 raise HTTPException(status_code=400, detail=f"Thiếu cột trong file: {str(e)}")
 
-        # Làm sạch dữ liệu
-        df = df.fillna('')
-        df = df.apply(lambda series: series.map(convert_to_json_compliant))
+        # Làm sạch theo từng cột (NaN, inf, ngày giờ) và lấy luôn ma trận giá trị để ghi
+        values = sheet_values(df)
 
         # Cập nhật lên Google Sheet
-        try:
-            worksheet = spreadsheet.worksheet(sheet_name)
-        except gspread.exceptions.WorksheetNotFound:
-            worksheet = spreadsheet.add_worksheet(title=sheet_name, rows=df.shape[0] + 100, cols=df.shape[1] + 10)
-
-        worksheet.update([df.columns.values.tolist()] + df.values.tolist(),
-                         value_input_option=gspread.utils.ValueInputOption.user_entered)
+        worksheet = get_clients(CREDENTIALS_FILE, SCOPE).worksheet(SPREADSHEET_KEY, sheet_name,
+                                                                   create_rows=df.shape[0] + 100,
+                                                                   create_cols=df.shape[1] + 10)
+        # upload chờ giới hạn request và retry, chạy trong thread để không chặn event loop
+        stats = await run_in_threadpool(uploader.upload, worksheet, values)
 
         # Lưu file đã xử lý
         now = datetime.datetime.now()
@@ -106,9 +97,12 @@ async def process_file(file_path: str, original_filename: str):
         shutil.copy(file_path, saved_path)
 
         return {"status": "success",
-                "message": f"File {original_filename} đã được xử lý và cập nhật lên sheet {sheet_name}"}
+                "message": f"File {original_filename} đã được xử lý và cập nhật lên sheet {sheet_name}",
+                "upload": stats}
 
     except Exception as e:
+        # Sheet có thể đã bị đổi tên, xoá hoặc đổi kích thước bên ngoài, lần sau mở lại thay vì dùng handle cũ
+        get_clients(CREDENTIALS_FILE, SCOPE).forget(SPREADSHEET_KEY)
         raise HTTPException(status_code=500, detail=f"Lỗi khi xử lý file {original_filename}: {str(e)}")
 
 
@@ -181,8 +175,7 @@ async def upload_multiple_files(background_tasks: BackgroundTasks, files: List[U
 async def health_check():
     """Kiểm tra kết nối với Google Sheets"""
     try:
-        client = get_gspread_client()
-        spreadsheet = client.open_by_key(SPREADSHEET_KEY)
+        spreadsheet = get_spreadsheet()
         worksheets = [ws.title for ws in spreadsheet.worksheets()]
         return {
             "status": "healthy",
@@ -1,20 +1,17 @@
 import gspread
 import pandas as pd
-from oauth2client.service_account import ServiceAccountCredentials
 import os
-import json
 import shutil
 import datetime
 import tkinter as tk
 from tkinter import filedialog
 
 # Thiết lập kết nối Google Sheets
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
+from google_clients import get_clients
+from sheet_uploader import SheetUploader
+from sheet_values import sheet_values
 
-scope = ['https://spreadsheets.google.com/feeds', 'https://www.googleapis.com/auth/drive']
-creds = ServiceAccountCredentials.from_json_keyfile_name('decent-trail-451507-d7-d59973874d84.json', scope)
-client = gspread.authorize(creds)
+clients = get_clients('decent-trail-451507-d7-d59973874d84.json')
 
 print("✅ Kết nối Google Sheets thành công!")
 
@@ -38,22 +35,10 @@ if not os.path.exists(processed_folder):
     os.makedirs(processed_folder)
 
 
-# Hàm chuyển đổi dữ liệu để tránh lỗi JSON
-def convert_to_json_compliant(value):
-    if pd.isna(value):
-        return ""
-    if isinstance(value, float) and (value == float('inf') or value == float('-inf')):
-        return str(value)
-    try:
-        json.dumps(value)
-        return value
-    except (OverflowError, ValueError):
-        return str(value) if isinstance(value, float) else value
-
-
 # Lặp qua từng file đã chọn
 spreadsheet_key = '1kNMeY5JrRbvocmYktfWOoWJUamW6W8AQNATDgjgtGW0'
-spreadsheet = client.open_by_key(spreadsheet_key)
+spreadsheet = clients.spreadsheet(spreadsheet_key)
+uploader = SheetUploader()
 
 for file_path in file_paths:
     filename = os.path.basename(file_path)
@@ -89,9 +74,8 @@ for file_path in file_paths:
                     print(f"Lỗi: Thiếu cột trong tệp {filename}: {e}")
                     continue
 
-            # Làm sạch dữ liệu
-            df = df.fillna('')
-            df = df.apply(lambda series: series.map(convert_to_json_compliant))
+            # Làm sạch theo từng cột (NaN, inf, ngày giờ) và lấy luôn ma trận giá trị để ghi
+            values = sheet_values(df)
 
             # Cập nhật lên Google Sheet
             try:
@@ -99,8 +83,10 @@ for file_path in file_paths:
             except gspread.exceptions.WorksheetNotFound:
                 worksheet = spreadsheet.add_worksheet(title=sheet_name, rows=df.shape[0] + 100, cols=df.shape[1] + 10)
 
-            worksheet.update([df.columns.values.tolist()] + df.values.tolist(),
-                             value_input_option=gspread.utils.ValueInputOption.user_entered)
+            # Ghi theo từng khối song song, khối lỗi được gửi lại riêng thay vì gửi lại cả file
+            stats = uploader.upload(worksheet, values)
+            print(f"Đã ghi {stats['rows']} dòng lên sheet {sheet_name} trong {stats['seconds']} giây "
+                  f"({stats['rows_per_sec']} dòng/giây, {stats['chunks']} khối, {stats['retries']} lần thử lại)")
 
             # Di chuyển file đã xử lý
             new_filename = filename
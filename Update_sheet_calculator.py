@@ -1,32 +1,20 @@
 import gspread
 import pandas as pd
-from oauth2client.service_account import ServiceAccountCredentials
+from google_clients import get_clients
+from sheet_uploader import SheetUploader
+from sheet_values import sheet_values
 import os
-import json
 import shutil
-from googleapiclient.discovery import build
 import datetime
 
-scope = ['https://spreadsheets.google.com/feeds', 'https://www.googleapis.com/auth/drive']
-creds = ServiceAccountCredentials.from_json_keyfile_name('luminous-lodge-321503-c17157d58b87.json', scope)
-client = gspread.authorize(creds)
+clients = get_clients('luminous-lodge-321503-c17157d58b87.json')
 
 folder_path = r'D:\Fix Image'
 spreadsheet_key = 'https://docs.google.com/spreadsheets/d/1kNMeY5JrRbvocmYktfWOoWJUamW6W8AQNATDgjgtGW0/edit'
-spreadsheet = client.open_by_url(spreadsheet_key)
+spreadsheet = clients.spreadsheet(spreadsheet_key)
+uploader = SheetUploader()
 
 #-------------------------------Update_sheet_calculator----------------------------------#
-def convert_to_json_compliant(value):
-    if pd.isna(value):
-        return ""
-    if isinstance(value, float) and (value == float('inf') or value == float('-inf')):
-        return str(value)
-    try:
-        json.dumps(value)
-        return value
-    except (OverflowError, ValueError):
-        return str(value) if isinstance(value, float) else value
-
 processed_folder = os.path.join(folder_path, "Updated")
 if not os.path.exists(processed_folder):
     os.makedirs(processed_folder)
@@ -68,8 +56,8 @@ for filename in os.listdir(folder_path):
                     except KeyError as e:  # Find column fail
                         print(f"Lỗi: Thiếu cột trong tệp {filename}: {e}")
                         continue  # skip file
-                df = df.fillna('')
-                df = df.apply(lambda series: series.map(convert_to_json_compliant))
+                # Làm sạch theo từng cột (NaN, inf, ngày giờ) và lấy luôn ma trận giá trị để ghi
+                values = sheet_values(df)
 
                 try:
                     worksheet = spreadsheet.worksheet(sheet_name)
@@ -77,8 +65,10 @@ for filename in os.listdir(folder_path):
                     worksheet = spreadsheet.add_worksheet(title=sheet_name, rows=df.shape[0] + 100,
                                                           cols=df.shape[1] + 10)
 
-                worksheet.update([df.columns.values.tolist()] + df.values.tolist(),
-                                 value_input_option=gspread.utils.ValueInputOption.user_entered)
+                # Ghi theo từng khối song song, khối lỗi được gửi lại riêng thay vì gửi lại cả file
+                stats = uploader.upload(worksheet, values)
+                print(f"Đã ghi {stats['rows']} dòng lên sheet {sheet_name} trong {stats['seconds']} giây "
+                      f"({stats['rows_per_sec']} dòng/giây, {stats['chunks']} khối, {stats['retries']} lần thử lại)")
                 new_filename = filename
                 if os.path.exists(os.path.join(processed_folder, filename)):
                     now = datetime.datetime.now()
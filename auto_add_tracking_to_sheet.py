@@ -5,7 +5,7 @@ import fitz
 import pytesseract as tess
 from PIL import Image
 import re
-import pygsheets
+from google_clients import get_clients
 import requests
 
 BASE_DIR = Path(__file__).resolve().parent
@@ -26,7 +26,7 @@ FEDEX1 = r"\bID# \d{4} \d{4} \d{4}\b"
 
 def connect_to_sheet(sheet_id: str):
     sheet_name = input("Tên sheet: ")
-    gc = pygsheets.authorize(service_account_file=JSON_PATH)
+    gc = get_clients(str(JSON_PATH)).pygsheets()
     spreadsheet = gc.open_by_key(sheet_id)
     worksheet = spreadsheet.worksheet_by_title(sheet_name.strip())
     return worksheet
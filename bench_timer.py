@@ -0,0 +1,13 @@
+import time
+
+
+def timed(fn, repeat=1):
+    """Return (best seconds of repeat runs, result of the last run)"""
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
@@ -1,19 +1,32 @@
-import hashlib
+from file_hasher import FileHasher
+
+# Hashes are kept in hash_cache.db, comparing the same files again does not read them.
+# Opened on first use, importing this module does not touch the cache file.
+_hasher = None
+
+
+def get_hasher():
+    global _hasher
+    if _hasher is None:
+        _hasher = FileHasher(algorithm="md5")
+    return _hasher
 
 
 def calculate_md5(file_path):
     """Calculate the MD5 hash of a file."""
-    with open(file_path, "rb") as f:
-        file_hash = hashlib.md5()
-        while chunk := f.read(8192):
-            file_hash.update(chunk)
-    return file_hash.hexdigest()
+    return get_hasher().hash(file_path)
 
 
 def compare_images(image1_path, image2_path):
     """Compare two images by their MD5 hashes."""
-    md5_1 = calculate_md5(image1_path)
-    md5_2 = calculate_md5(image2_path)
+    # Both files are hashed at the same time
+    hashes = get_hasher().hash_many([image1_path, image2_path])
+    md5_1 = hashes.get(image1_path)
+    md5_2 = hashes.get(image2_path)
+    # hash_many skips files it cannot read, report them like opening the file did
+    for path, digest in ((image1_path, md5_1), (image2_path, md5_2)):
+        if digest is None:
+            raise FileNotFoundError(f"No such file or cannot read: {path}")
 
     if md5_1 == md5_2:
         print("The images are identical.")
@@ -1,25 +1,20 @@
-import os
 import datetime
 import pyinputplus as pyip
+from day_traversal import DayTraversal, PdfCounter
 
 today = datetime.datetime.now()
 folder_name = str(today.year) + "_" + str(today.month) + "_" + str(today.day)
-folder_root = str(today.year) + "_" + str(today.month)
 # folder_name = "2024_6_4"
-# folder_root = "2024_6"
+DROPBOX_ROOT = "D:/FlashPOD Dropbox/FlashPOD"
 
 
-def get_path(machine):
-    path_root = (
-        "D:/FlashPOD Dropbox/FlashPOD/Machine "
-        + str(machine)
-        + "/"
-        + folder_root
-        + "/"
-        + folder_name
-        + "/"
-    )
-    return path_root
+def count_machines(machines):
+    # Một lần duyệt song song các folder ngày của tất cả các máy
+    traversal = DayTraversal(DROPBOX_ROOT, folder_name, machines)
+    counter = traversal.register(PdfCounter())
+    traversal.run()
+    counts = counter.result()
+    return [counts.get(name, 0) for name in traversal.machine_names()]
 
 
 def main():
@@ -29,14 +24,9 @@ def main():
         if key == 1:
             total = 0
             print("DATE\t   :", folder_name)
-            for m in range(1, 43):
-                count = 0
-                path = get_path(m)
-                # path = "D:\\FlashPOD Dropbox\\FlashPOD\\"
-                for _, _, files in os.walk(path):
-                    for file in files:
-                        if file.endswith(".pdf"):
-                            count += 1
+            # Đếm tất cả các máy rồi in theo thứ tự
+            counts = count_machines(range(1, 43))
+            for m, count in zip(range(1, 43), counts):
                 total += count
                 if m < 10:
                     print("Machine 0" + str(m), ":", count)
@@ -0,0 +1,61 @@
+import datetime
+from google_clients import get_clients
+import pandas as pd
+from day_traversal import DayTraversal, OrderSellerList, PdfCounter, SetSingleSplit
+
+today = datetime.datetime.now()
+FOLDER_NAME = str(today.year) + "_" + str(today.month) + "_" + str(today.day)
+# FOLDER_NAME = "2025_1_7"
+
+DROPBOX_PATH = "D:\\FlashPOD Dropbox\\FlashPOD\\"
+JSON_PATH = (
+    r"D:\work\pet_project\luminous-lodge-321503-c17157d58b87.json"
+)
+SHEET_ID = "1kNMeY5JrRbvocmYktfWOoWJUamW6W8AQNATDgjgtGW0"
+SHEET_NAME = "Get_Order_Code"
+EXCEL_PATH = "D:\\work\\pet_project\\img\\HOTSHOT_" + FOLDER_NAME + ".xlsx"
+MACHINES = range(1, 43)
+
+
+def print_counts(machine_names, counts):
+    total = 0
+    print("DATE\t   :", FOLDER_NAME)
+    for name in machine_names:
+        total += counts.get(name, 0)
+        print(name, ":", counts.get(name, 0))
+    print("Tổng\t   :", total)
+
+
+def upload_order_codes(machine_names, orders):
+    gc = get_clients(JSON_PATH).pygsheets()
+    worksheet = gc.open_by_key(SHEET_ID).worksheet_by_title(SHEET_NAME)
+    i = 0
+    for name in machine_names:
+        list_order, list_seller = orders.get(name, ([], []))
+        worksheet.set_dataframe(pd.DataFrame(list_order), start=(1, 1 + i), copy_head=False)
+        worksheet.set_dataframe(pd.DataFrame(list_seller), start=(1, 2 + i), copy_head=False)
+        i += 2
+
+
+def export_hotshot(singles, sets):
+    with pd.ExcelWriter(EXCEL_PATH, engine="openpyxl") as writer:
+        pd.DataFrame(singles).to_excel(writer, sheet_name="Sheet1", index=False)
+        pd.DataFrame(sets).to_excel(writer, sheet_name="Sheet2", index=False)
+    print("Excel file " + EXCEL_PATH + " created successfully!")
+
+
+def main():
+    # Duyệt các folder ngày một lần cho cả đếm PDF, order code/seller và danh sách HOTSHOT
+    traversal = DayTraversal(DROPBOX_PATH, FOLDER_NAME, MACHINES)
+    counter = traversal.register(PdfCounter())
+    orders = traversal.register(OrderSellerList())
+    split = traversal.register(SetSingleSplit())
+    traversal.run()
+
+    machine_names = traversal.machine_names()
+    print_counts(machine_names, counter.result())
+    upload_order_codes(machine_names, orders.result())
+    export_hotshot(*split.result())
+
+
+main()
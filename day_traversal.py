@@ -0,0 +1,166 @@
+import os
+import queue
+import logging
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from folder_scanner import MAX_WORKERS, machine_folders, walk_files
+from order_parser import parse_order
+from path_resolver import machine_path, resolve_date_folders
+
+logger = logging.getLogger("day_traversal")
+
+# PDFs handed from a worker to the consumers at a time, and chunks allowed to wait in the queue
+CHUNK_SIZE = 256
+QUEUE_CHUNKS = 64
+
+
+class Consumer:
+    """Receives every PDF of a traversal, override add() and result()"""
+
+    def add(self, machine, entry, order):
+        """Called once per PDF, order is None if the file name does not follow the naming rule"""
+
+    def result(self):
+        return None
+
+
+class PdfCounter(Consumer):
+    """Number of PDFs per machine in the day's date folders"""
+
+    def __init__(self):
+        self.counts = defaultdict(int)
+
+    def add(self, machine, entry, order):
+        self.counts[machine] += 1
+
+    def result(self):
+        return dict(self.counts)
+
+
+class OrderSellerList(Consumer):
+    """Order codes and sellers per machine, in file order with duplicates kept"""
+
+    def __init__(self):
+        self.orders = defaultdict(list)
+        self.sellers = defaultdict(list)
+
+    def add(self, machine, entry, order):
+        if order is not None:
+            self.orders[machine].append(order.order_code)
+            self.sellers[machine].append(order.seller)
+
+    def result(self):
+        return {machine: (self.orders[machine], self.sellers[machine]) for machine in self.orders}
+
+
+class SetSingleSplit(Consumer):
+    """Order codes of single items and of sets, without duplicates"""
+
+    def __init__(self):
+        self.singles = {}
+        self.sets = {}
+
+    def add(self, machine, entry, order):
+        if order is not None:
+            (self.sets if order.is_set else self.singles)[order.order_code] = None
+
+    def result(self):
+        return list(self.singles), list(self.sets)
+
+
+def _parsed(folders):
+    for folder in folders:
+        for entry in walk_files(folder):
+            yield entry, parse_order(entry.name)
+
+
+class DayTraversal:
+    """Walk the date folders of a day once and feed every PDF to all registered consumers.
+
+    Machines are listed in parallel and each file name is parsed once. PDFs are handed to
+    the consumers in chunks as the workers find them, so the day is never held in memory
+    as a whole. Consumers are called from the thread running run() and need no locking,
+    the PDFs of one machine arrive in file order, machines interleave as they are scanned.
+    """
+
+    def __init__(self, main_folder, target_date, machines=None, max_workers=MAX_WORKERS):
+        self.main_folder = main_folder
+        self.target_date = target_date
+        self.machines = machines
+        self.max_workers = max_workers
+        self.consumers = []
+
+    def register(self, consumer):
+        self.consumers.append(consumer)
+        return consumer
+
+    def machine_names(self):
+        if self.machines is not None:
+            return [os.path.basename(machine_path(self.main_folder, machine)) for machine in self.machines]
+        return [os.path.basename(path) for path in machine_folders(self.main_folder)]
+
+    def run(self):
+        """Traverse the day once, return the number of PDFs fed to the consumers"""
+        names = self.machine_names()
+        chunks = queue.Queue(QUEUE_CHUNKS)
+        stopped = threading.Event()
+
+        def put(item):
+            # Give up once run() stopped reading, a full queue would otherwise block the worker forever
+            while not stopped.is_set():
+                try:
+                    chunks.put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    pass
+
+        def scan(machine):
+            # Runs on a worker thread: list and parse here, the consumers are fed in the caller's thread
+            try:
+                folders = resolve_date_folders(machine_path(self.main_folder, machine), self.target_date)
+                chunk = []
+                for pdf in _parsed(folders):
+                    if stopped.is_set():
+                        return
+                    chunk.append(pdf)
+                    if len(chunk) >= CHUNK_SIZE:
+                        put((machine, chunk))
+                        chunk = []
+                put((machine, chunk))
+                put((machine, None))
+            except BaseException as e:
+                put((machine, e))
+
+        total = 0
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            for machine in names:
+                pool.submit(scan, machine)
+            try:
+                remaining = len(names)
+                while remaining:
+                    machine, chunk = chunks.get()
+                    if chunk is None:
+                        remaining -= 1
+                        continue
+                    if isinstance(chunk, BaseException):
+                        raise chunk
+                    for entry, order in chunk:
+                        for consumer in self.consumers:
+                            consumer.add(machine, entry, order)
+                    total += len(chunk)
+            finally:
+                stopped.set()
+        logger.info(f"Fed {total} PDFs of {self.target_date} to {len(self.consumers)} consumers")
+        return total
+
+
+def traverse_folder(path, consumers, machine=""):
+    """Walk a single folder once and feed its PDFs to every consumer"""
+    total = 0
+    for entry, order in _parsed([path]):
+        for consumer in consumers:
+            consumer.add(machine, entry, order)
+        total += 1
+    return total
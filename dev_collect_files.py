@@ -1,14 +1,18 @@
 import datetime
 import os
-import shutil
 import csv
 from pathlib import Path
+from move_engine import MoveEngine
+from order_matcher import CodeMatcher, find_codes
+from order_parser import parse_batch
 
 today = datetime.datetime.now()
 folder_created = "before21_line6"
 backup_path = r"D:\FlashPOD Dropbox\BackupFlashPOD"
 csv_folder = r"D:\work\pet_project\img\folder.csv"
 csv_ordercode = r"D:\work\pet_project\img\order_code.csv"
+# True: chỉ in kế hoạch move, không tạo folder và không move file
+dry_run = False
 
 
 def importCSV(path):
@@ -26,43 +30,58 @@ def createDestinationFolder(folder_name):
     set_des.mkdir(parents=True, exist_ok=True)
 
 
-def getPathForMoveFile(order_list, folder_list):
+def buildCodeIndex(order_list, folder_list):
+    # Duyệt mỗi folder một lần, mỗi tên file chỉ quét một lượt cho tất cả order code
+    matcher = CodeMatcher(order_list)
+    code_index = {}
+    for folder in dict.fromkeys(folder_list):
+        local_path = Path("D:/", folder)
+        for order_code, path in find_codes(str(local_path), matcher):
+            code_index.setdefault(order_code, set()).add(Path(path))
+    return code_index
+
+
+def planMoves(order_list, folder_list):
+    # Kế hoạch move {file gốc: file đích} và các folder đích cần tạo, mỗi file chỉ xuất hiện một lần
+    code_index = buildCodeIndex(order_list, folder_list)
+    plan = {}
+    folders = set()
+    for order_code in order_list:
+        for source_path in sorted(code_index.get(order_code, ())):
+            if source_path in plan:
+                continue
+            # fmt: off
+            folder_name = source_path.parts[6]                # D:\FlashPOD Dropbox\FlashPOD\Machine 2\2024_12\2024_12_10\<<01_24H_1210_P2_SET_HOODIE_GILDAN_27>>\.pdf
+            folder_name = parse_batch(folder_name).group      # 23_EX_1216_P12_<<SINGLE_SHIRT_INTHEOMOCKUP_DOILINE>>_1
+            # fmt: on
+            plan[source_path] = Path(backup_path, folder_created, folder_name, source_path.name)
+            folders.add(folder_name)
+    return plan, folders
+
+
+def printPlan(plan, folders):
+    print("Folder cần tạo:", len(folders))
+    for folder_name in sorted(folders):
+        print("  ", Path(backup_path, folder_created, folder_name))
+    print("File cần move:", len(plan))
+    for source, destination in plan.items():
+        print("  ", source, "->", destination)
+
+
+def getPathForMoveFile(order_list, folder_list, dry_run=False):
     if len(order_list) != len(folder_list):
         raise ValueError("Check lại 2 files .csv.")
     else:
         print("order_list = folder_list => OK!")
 
-    source_list = []
-    destination_list = []
-
-    for folder in folder_list:
-        local_path = Path("D:/", folder)
-        for dirpaths, _, files in os.walk(local_path):
-            for file in files:
-                full_path = Path(dirpaths) / file
-                filename = full_path.name
-                # fmt: off
-                folder_name = full_path.parts[6] # D:\FlashPOD Dropbox\FlashPOD\Machine 2\2024_12\2024_12_10\<<01_24H_1210_P2_SET_HOODIE_GILDAN_27>>\.pdf
-                # fmt: on
-                for order_code in order_list:
-                    if order_code in filename:
-                        source_path = Path(local_path, filename)
-                        if source_path not in source_list:
-                            source_list.append(source_path)
-                        # fmt: off
-                        a = folder_name.split("_")          # "23","EX","1216","P12","SINGLE","SHIRT","INTHEOMOCKUP","DOILINE","1"
-                        
-                        if a[1] in ["24H", "EX", "O9"]:     # 23_<<EX>>_1216_P12_SINGLE_SHIRT_INTHEOMOCKUP_DOILINE_1
-                            folder_name = "_".join(a[4:-1]) # 23_<<EX>>_1216_P12_<<SINGLE_SHIRT_INTHEOMOCKUP_DOILINE>>_1 
-                        else:
-                            folder_name = "_".join(a[3:-1]) # 23_1216_P12_<<SINGLE_SHIRT_INTHEOMOCKUP_DOILINE>>_1
-                        destination_path = Path(backup_path, folder_created, folder_name, filename)
-                        # fmt: on
-                        if destination_path not in destination_list:
-                            destination_list.append(destination_path)
-
-                        createDestinationFolder(folder_name)
-    return source_list, destination_list
+    plan, folders = planMoves(order_list, folder_list)
+    if dry_run:
+        printPlan(plan, folders)
+    else:
+        # Mỗi folder đích chỉ tạo một lần
+        for folder_name in folders:
+            createDestinationFolder(folder_name)
+    return list(plan.keys()), list(plan.values())
 
 
 def moveFile(source_list, destination_list):
@@ -71,19 +90,21 @@ def moveFile(source_list, destination_list):
     else:
         print("Source list = Destination list => OK")
     print("Bắt đầu move files...")
-    for source, destination in zip(source_list, destination_list):
-        try:
-            shutil.move(source, destination)
-        except Exception as e:
-            print("Error", e)
+    # Journal ghi lại các file đã move xong, chạy lại sẽ bỏ qua chúng
+    engine = MoveEngine(os.path.join(backup_path, folder_created, "move_journal.jsonl"))
+    result = engine.move_all(zip(source_list, destination_list))
+    for source, destination, error in result["failed"]:
+        print("Error", source, error)
+    print("Moved:", len(result["moved"]), "Skipped:", len(result["skipped"]), "Failed:", len(result["failed"]))
 
 
 def main():
     folder_list = importCSV(csv_folder)
     order_list = importCSV(csv_ordercode)
-    source_list, destination_list = getPathForMoveFile(order_list, folder_list)
+    source_list, destination_list = getPathForMoveFile(order_list, folder_list, dry_run)
     # print(len(source_list), len(destination_list))
-    moveFile(source_list, destination_list)
+    if not dry_run:
+        moveFile(source_list, destination_list)
 
 
 main()
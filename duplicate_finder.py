@@ -0,0 +1,121 @@
+import os
+import hashlib
+import logging
+from collections import defaultdict
+
+from file_hasher import FileHasher
+from folder_scanner import MAX_WORKERS, machine_folders, scan_parallel, walk_files
+from path_resolver import resolver
+
+logger = logging.getLogger("duplicate_finder")
+
+# Bytes read from the start and from the end of a file for the partial hash
+PARTIAL_SIZE = 64 * 1024
+
+MAIN_FOLDER = "D:\\FlashPOD Dropbox\\FlashPOD"
+# Ngày cần kiểm tra, để None để kiểm tra toàn bộ các máy
+TARGET_DATE = "2025_1_7"
+
+
+def collect_files(main_folder, target_date=None, suffix=".pdf", max_workers=MAX_WORKERS):
+    """Return (path, size) of every file below the main folder, or below the folders of one date.
+
+    Machine folders are walked in parallel.
+    """
+    def collect_machine(machine_folder):
+        roots = resolver.date_folders(machine_folder, target_date) if target_date else [machine_folder]
+        files = []
+        for root in roots:
+            for entry in walk_files(root, suffix):
+                try:
+                    files.append((entry.path, entry.stat().st_size))
+                except OSError:
+                    continue
+        return files
+
+    files = []
+    for machine_files in scan_parallel(machine_folders(main_folder), collect_machine, max_workers):
+        files.extend(machine_files)
+    return files
+
+
+def partial_hash(path, size):
+    """MD5 of the first and last PARTIAL_SIZE bytes of a file, the whole file if it is small"""
+    file_hash = hashlib.md5()
+    with open(path, "rb") as f:
+        file_hash.update(f.read(PARTIAL_SIZE))
+        if size > 2 * PARTIAL_SIZE:
+            f.seek(-PARTIAL_SIZE, os.SEEK_END)
+        file_hash.update(f.read(PARTIAL_SIZE))
+    return file_hash.hexdigest()
+
+
+def _group_by_hash(candidates, hash_file, max_workers):
+    # Hash every candidate in parallel, return only the groups holding more than one file
+    def safe_hash(item):
+        try:
+            return hash_file(*item)
+        except OSError as e:
+            logger.warning(f"Cannot read {item[0]}: {e}")
+            return None
+
+    groups = defaultdict(list)
+    for (path, size), digest in zip(candidates, scan_parallel(candidates, safe_hash, max_workers)):
+        if digest is not None:
+            groups[(size, digest)].append(path)
+    return {key: paths for key, paths in groups.items() if len(paths) > 1}
+
+
+def find_duplicates(files, max_workers=MAX_WORKERS, hasher=None):
+    """Return duplicate groups [{"size", "hash", "paths"}] of (path, size) files, most wasted bytes first.
+
+    Files are grouped by size, same-size files by a hash of their head and tail, and
+    only the files still matching after that are read in full, through the FileHasher
+    cache when one is given.
+    """
+    hasher = hasher or FileHasher(cache_file=None, max_workers=max_workers)
+    by_size = defaultdict(list)
+    for path, size in files:
+        by_size[size].append(path)
+    candidates = [(path, size) for size, paths in by_size.items() if size > 0 and len(paths) > 1
+                  for path in paths]
+    logger.info(f"{len(candidates)} of {len(files)} files share their size with another file")
+
+    partial_groups = _group_by_hash(candidates, partial_hash, max_workers)
+    result = []
+    full_candidates = []
+    for (size, digest), paths in partial_groups.items():
+        if size <= 2 * PARTIAL_SIZE:
+            # The partial hash already covered every byte of these files
+            result.append({"size": size, "hash": digest, "paths": sorted(paths)})
+        else:
+            full_candidates.extend((path, size) for path in paths)
+    logger.info(f"{len(full_candidates)} large files left to hash in full")
+
+    full_groups = defaultdict(list)
+    full_hashes = hasher.hash_many(path for path, _ in full_candidates)
+    for path, size in full_candidates:
+        if path in full_hashes:
+            full_groups[(size, full_hashes[path])].append(path)
+    for (size, digest), paths in full_groups.items():
+        if len(paths) > 1:
+            result.append({"size": size, "hash": digest, "paths": sorted(paths)})
+
+    result.sort(key=lambda group: (-group["size"] * (len(group["paths"]) - 1), group["paths"][0]))
+    return result
+
+
+def main():
+    files = collect_files(MAIN_FOLDER, TARGET_DATE)
+    groups = find_duplicates(files, hasher=FileHasher())
+    wasted = 0
+    for group in groups:
+        wasted += group["size"] * (len(group["paths"]) - 1)
+        print(f"{group['hash']} ({group['size']} bytes, {len(group['paths'])} files)")
+        for path in group["paths"]:
+            print("    " + path)
+    print(f"Tổng: {len(files)} file, {len(groups)} nhóm trùng, {wasted} bytes thừa")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+import os
+import random
+import argparse
+import datetime
+
+from path_resolver import MACHINE_PREFIX, split_date
+
+SIDES = ("FRONT", "BACK")
+SIZES = ("S", "M", "L", "XL", "2XL")
+COLORS = ("BLACK", "WHITE", "NAVY", "SAND", "RED")
+PRODUCTS = (("HOODIE", "GILDAN"), ("TEE", "BELLA"), ("SWEATSHIRT", "GILDAN"))
+PRINTERS = ("P1", "P2", "P3")
+
+
+def order_file_name(order_code, day, set_number, set_order, side, size, color, seller, product_type, provider):
+    """Build a PDF name in the layout parse_order reads, single orders have the date first"""
+    date = day.strftime("%Y%m%d")
+    if set_number == 1:
+        first, third = date, order_code
+    else:
+        first, third = order_code, date
+    return f"{first}_{side}_{third}_{size}_{color}_{set_number}_{set_order}_{seller}_{product_type}_{provider}.pdf"
+
+
+def generate_farm(root, start_date, days=1, machines=42, batches=4, pdfs_per_batch=50, set_ratio=0.3,
+                  sellers=50, seed=0):
+    """Create <root>/Machine N/YYYY_M/YYYY_M_D/<batch>/*.pdf with zero-byte PDFs.
+
+    Returns {"dates": [...], "files": count, "codes": [order code, ...]} so benchmarks know
+    what they should find.
+    """
+    rng = random.Random(seed)
+    start = datetime.date(*split_date(start_date))
+    dates = []
+    codes = []
+    files = 0
+    next_code = 100000
+    for day_offset in range(days):
+        day = start + datetime.timedelta(days=day_offset)
+        date_name = f"{day.year}_{day.month}_{day.day}"
+        dates.append(date_name)
+        for machine in range(1, machines + 1):
+            date_folder = os.path.join(root, MACHINE_PREFIX + str(machine), f"{day.year}_{day.month}", date_name)
+            for batch in range(1, batches + 1):
+                product_type, provider = rng.choice(PRODUCTS)
+                rush = "_24H" if rng.random() < 0.2 else ""
+                batch_name = (f"{batch:02d}{rush}_{day.month:02d}{day.day:02d}_{rng.choice(PRINTERS)}_"
+                              f"{'SET_' if rng.random() < set_ratio else ''}{product_type}_{provider}_{batch}")
+                batch_folder = os.path.join(date_folder, batch_name)
+                os.makedirs(batch_folder, exist_ok=True)
+
+                written = 0
+                while written < pdfs_per_batch:
+                    order_code = f"ORD{next_code}"
+                    next_code += 1
+                    codes.append(order_code)
+                    seller = f"SELLER{rng.randrange(sellers)}"
+                    set_number = rng.randint(2, 4) if rng.random() < set_ratio else 1
+                    size, color = rng.choice(SIZES), rng.choice(COLORS)
+                    for set_order in range(1, set_number + 1):
+                        if written >= pdfs_per_batch:
+                            break
+                        name = order_file_name(order_code, day, set_number, set_order, rng.choice(SIDES),
+                                               size, color, seller, product_type, provider)
+                        open(os.path.join(batch_folder, name), "wb").close()
+                        written += 1
+                files += written
+    return {"dates": dates, "files": files, "codes": codes}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tạo cây thư mục giả lập Dropbox để benchmark quét PDF.")
+    parser.add_argument("root", help="Folder gốc sẽ chứa các folder Machine N")
+    parser.add_argument("--start", default="2025_1_7", help="Ngày đầu tiên, dạng YYYY_M_D")
+    parser.add_argument("--days", type=int, default=1)
+    parser.add_argument("--machines", type=int, default=42)
+    parser.add_argument("--batches", type=int, default=4, help="Số batch mỗi máy mỗi ngày")
+    parser.add_argument("--pdfs", type=int, default=50, help="Số PDF mỗi batch")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    summary = generate_farm(args.root, args.start, args.days, args.machines, args.batches, args.pdfs, seed=args.seed)
+    print(f"Đã tạo {summary['files']} PDF, {len(summary['codes'])} order code, ngày: {', '.join(summary['dates'])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+import os
+import mmap
+import sqlite3
+import hashlib
+import logging
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+logger = logging.getLogger("file_hasher")
+
+# Next to the code, so scripts started from any folder share the cached hashes
+HASH_CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "hash_cache.db")
+ALGORITHMS = {"md5": hashlib.md5, "blake2b": hashlib.blake2b}
+
+# Files hashed at the same time, hashlib releases the GIL on large updates so threads scale
+MAX_WORKERS = 8
+# Buffer of the streamed reads, files from MMAP_THRESHOLD up are hashed through mmap instead
+BUFFER_SIZE = 1024 * 1024
+MMAP_THRESHOLD = 16 * 1024 * 1024
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS hashes (
+    path TEXT NOT NULL,
+    algorithm TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    inode INTEGER NOT NULL,
+    digest TEXT NOT NULL,
+    PRIMARY KEY (path, algorithm)
+);
+"""
+
+
+def hash_file(path, algorithm="md5"):
+    """Hash a whole file with one 1 MiB buffer reused for every read, or through mmap if it is large"""
+    file_hash = ALGORITHMS[algorithm]()
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size >= MMAP_THRESHOLD:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                file_hash.update(mapped)
+        else:
+            buffer = bytearray(BUFFER_SIZE)
+            view = memoryview(buffer)
+            while read := f.readinto(buffer):
+                file_hash.update(view[:read])
+    return file_hash.hexdigest()
+
+
+def _hash_or_none(path, algorithm):
+    # Pool worker, a file removed or locked while hashing is reported instead of failing the batch
+    try:
+        return hash_file(path, algorithm)
+    except OSError as e:
+        logger.warning(f"Cannot hash {path}: {e}")
+        return None
+
+
+def file_key(path):
+    """Return the (size, mtime_ns, inode) a cached hash of the file is valid for"""
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns, stat.st_ino
+
+
+class FileHasher:
+    """Hash files on a pool and remember the digests in SQLite.
+
+    A cached digest is reused as long as the size, mtime and inode of the file are the
+    same as when it was hashed. With cache_file=None the cache only lives in memory.
+    """
+
+    def __init__(self, cache_file=HASH_CACHE_FILE, algorithm="md5", max_workers=MAX_WORKERS,
+                 use_processes=False):
+        if algorithm not in ALGORITHMS:
+            raise ValueError(f"Unknown hash algorithm: {algorithm}, expected one of {', '.join(ALGORITHMS)}")
+        self.algorithm = algorithm
+        self.max_workers = max_workers
+        self.use_processes = use_processes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(cache_file or ":memory:", check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+        self.hits = 0
+        self.misses = 0
+
+    def close(self):
+        self._conn.close()
+
+    def _cached(self, path, key):
+        # Caller holds the lock, a digest counts only if the file is still the one that was hashed
+        row = self._conn.execute(
+            "SELECT size, mtime_ns, inode, digest FROM hashes WHERE path = ? AND algorithm = ?",
+            (path, self.algorithm)).fetchone()
+        if row is not None and tuple(row[:3]) == key:
+            self.hits += 1
+            return row[3]
+        self.misses += 1
+        return None
+
+    def _store(self, hashed):
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO hashes VALUES (?, ?, ?, ?, ?, ?)",
+                [(path, self.algorithm) + key + (digest,) for path, key, digest in hashed])
+
+    def hash(self, path):
+        """Return the digest of one file, a missing or unreadable file raises like open() does"""
+        key = file_key(path)
+        with self._lock:
+            digest = self._cached(path, key)
+        if digest is None:
+            digest = hash_file(path, self.algorithm)
+            self._store([(path, key, digest)])
+        return digest
+
+    def hash_many(self, paths):
+        """Return {path: digest} for every readable path, hashing only the files not in the cache"""
+        keys = []
+        for path in dict.fromkeys(paths):
+            try:
+                keys.append((path, file_key(path)))
+            except OSError as e:
+                logger.warning(f"Cannot hash {path}: {e}")
+
+        result = {}
+        missing = []
+        with self._lock:
+            for path, key in keys:
+                digest = self._cached(path, key)
+                if digest is not None:
+                    result[path] = digest
+                else:
+                    missing.append((path, key))
+
+        if missing:
+            pool_class = ProcessPoolExecutor if self.use_processes and len(missing) > 1 else ThreadPoolExecutor
+            with pool_class(max_workers=min(self.max_workers, len(missing))) as pool:
+                digests = list(pool.map(_hash_or_none, [path for path, _ in missing],
+                                        [self.algorithm] * len(missing)))
+            hashed = [(path, key, digest) for (path, key), digest in zip(missing, digests) if digest is not None]
+            self._store(hashed)
+            for path, _, digest in hashed:
+                result[path] = digest
+        logger.debug(f"Returned {len(result)} digests, {len(missing)} files had to be read")
+        return result
+
+    def stats(self):
+        with self._lock:
+            return {"algorithm": self.algorithm, "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,111 @@
+import os
+import csv
+import logging
+
+from folder_scanner import walk_files
+from move_engine import MoveEngine
+
+logger = logging.getLogger("file_router")
+
+FOLDER_NAME = r"D:\FlashPOD Dropbox\FlashPOD\generated"
+MOVING_FOLDER = r"D:\FlashPOD Dropbox\FlashPOD\distributed"
+# Mỗi dòng: key, folder đích (tương đối với MOVING_FOLDER)
+ROUTES_CSV = r"D:\work\pet_project\img\routes.csv"
+
+
+class RoutePlan:
+    """Files found for each route key, as {key: {file name: path}} like DistributeFileMoveDto.files"""
+
+    def __init__(self, keys):
+        self.files = {key: {} for key in keys}
+        self.conflicts = []
+        self.unmatched = 0
+        self.skipped = 0
+
+    def total(self):
+        return sum(len(files) for files in self.files.values())
+
+
+class FileRouter:
+    """Route PDFs to a destination folder by the key they contain, as findOrderFileGenerated in ZZ.java.
+
+    A file belongs to key when its name contains "_" + key + "_". Instead of testing every
+    key against every file, each name is split on "_" once and its inner token runs are
+    looked up in a dict, so the cost grows with the number of files, not files x keys.
+    """
+
+    def __init__(self, routes):
+        self.routes = dict(routes)
+        # Keys may themselves contain "_", look up runs of as many tokens as each key has
+        self.key_lengths = sorted({key.count("_") + 1 for key in self.routes})
+
+    def match(self, file_name):
+        """Return every key contained in the file name between two underscores, first match first"""
+        tokens = file_name.split("_")
+        found = []
+        # The first and last token have no "_" on one side, so a key can only start at token 1
+        for start in range(1, len(tokens) - 1):
+            for length in self.key_lengths:
+                end = start + length
+                if end > len(tokens) - 1:
+                    break
+                key = tokens[start] if length == 1 else "_".join(tokens[start:end])
+                if key in self.routes and key not in found:
+                    found.append(key)
+        return found
+
+    def route(self, folder):
+        """Walk folder once and group its PDFs per key, skipping the *_barcode.pdf files"""
+        plan = RoutePlan(self.routes)
+        if not os.path.exists(folder):
+            logger.info(f"Routing folder does not exist: {folder}")
+            return plan
+        for entry in walk_files(folder):
+            if "_barcode.pdf" in entry.name:
+                plan.skipped += 1
+                continue
+            keys = self.match(entry.name)
+            if not keys:
+                plan.unmatched += 1
+                continue
+            if len(keys) > 1:
+                # A file can only be moved once, it goes to the key found first in its name
+                plan.conflicts.append((entry.path, keys))
+            plan.files[keys[0]][entry.name] = entry.path
+        logger.info(f"Routed {plan.total()} files to {sum(1 for f in plan.files.values() if f)} keys, "
+                    f"{plan.unmatched} unmatched, {plan.skipped} barcodes skipped, {len(plan.conflicts)} conflicts")
+        return plan
+
+    def moves(self, plan, moving_folder):
+        """Return the (source, destination) pairs moving every routed file into its destination folder"""
+        return [(path, os.path.join(moving_folder, self.routes[key], file_name))
+                for key, files in plan.files.items()
+                for file_name, path in files.items()]
+
+
+def load_routes(csv_path):
+    """Read {key: destination folder} from a two column CSV"""
+    routes = {}
+    with open(csv_path, "r", encoding="utf-8") as file:
+        for row in csv.reader(file):
+            if len(row) >= 2 and row[0]:
+                routes[row[0].strip()] = row[1].strip()
+    return routes
+
+
+def main():
+    router = FileRouter(load_routes(ROUTES_CSV))
+    plan = router.route(FOLDER_NAME)
+    for path, keys in plan.conflicts:
+        print("Trùng key:", path, "->", ", ".join(keys))
+    # Các file đã chuyển được ghi vào journal, chạy lại sẽ bỏ qua
+    engine = MoveEngine(os.path.join(MOVING_FOLDER, "route_journal.jsonl"))
+    result = engine.move_all(router.moves(plan, MOVING_FOLDER))
+    for src_path, des_path, error in result["failed"]:
+        print("Lỗi:", src_path, "->", des_path, ":", error)
+    print("Đã chuyển:", len(result["moved"]), "- Bỏ qua:", len(result["skipped"]),
+          "- Không khớp key:", plan.unmatched, "- Barcode:", plan.skipped)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,9 @@
 import datetime
-import os
 import shutil
 import csv
 from pathlib import Path
+from order_matcher import find_codes
+from path_resolver import split_location
 
 dropbox_path = r"D:\FlashPOD Dropbox\FlashPOD"
 
@@ -14,18 +15,11 @@ with open(r"D:\work\pet_project\img\list.csv", "r") as file:
 list_codes = [item[0] for item in data_code]
 
 
-list_path = []
 count = 0
 local_path = Path("D:/", dropbox_path)
-for dirpaths, dirnames, files in os.walk(local_path):
-    for file in files:
-        full_path = Path(dirpaths) / file
-        filename = full_path.name
-        for order_code in list_codes:
-            if order_code in filename:
-                if full_path not in list_path:
-                    a = str(full_path).split("\\")
-                    folder = str(a[6:-1])
-                    b = "_".join(folder.split("_"))
-                    print(order_code, "-", b[:-1])
+# Duyệt cây thư mục một lần, mỗi tên file chỉ quét một lượt cho tất cả các code
+for order_code, path in find_codes(str(local_path), list_codes):
+    machine, month, date, batch = split_location(str(local_path), path)
+    print(order_code, "-", machine, "/", date, "/", batch)
+    count += 1
 print(count)
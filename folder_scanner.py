@@ -0,0 +1,71 @@
+import os
+import logging
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+logger = logging.getLogger("folder_scanner")
+
+# Machine folders scanned at the same time, Dropbox disks do not get faster past this
+MAX_WORKERS = 8
+
+
+def list_folder(path):
+    """Return (dirs, files) DirEntry lists of a folder, both empty if it cannot be read"""
+    dirs = []
+    files = []
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                # DirEntry caches the file type from the listing, no extra stat call per entry
+                if entry.is_dir():
+                    dirs.append(entry)
+                else:
+                    files.append(entry)
+    except OSError as e:
+        logger.debug(f"Cannot list folder {path}: {e}")
+    return dirs, files
+
+
+def walk_files(path, suffix=".pdf"):
+    """Yield the DirEntry of every file below path whose name ends with suffix (like os.walk)"""
+    stack = [path]
+    while stack:
+        dirs, files = list_folder(stack.pop())
+        for entry in files:
+            if entry.name.lower().endswith(suffix):
+                yield entry
+        stack.extend(entry.path for entry in dirs if not entry.is_symlink())
+
+
+def machine_folders(main_folder):
+    """Return the paths of all sub folders of the main folder, sorted by name"""
+    dirs, _ = list_folder(main_folder)
+    return [entry.path for entry in sorted(dirs, key=lambda entry: entry.name)]
+
+
+def scan_parallel(paths, scan, max_workers=MAX_WORKERS):
+    """Run scan(path) for every path on a bounded thread pool and return the results in order"""
+    paths = list(paths)
+    if not paths:
+        return []
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(paths))) as pool:
+        return list(pool.map(scan, paths))
+
+
+def iter_parallel(items, work, max_workers=MAX_WORKERS):
+    """Yield (item, result) as soon as each work(item) finishes, with at most max_workers in flight"""
+    items = iter(items)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        running = {}
+        for item in items:
+            running[pool.submit(work, item)] = item
+            if len(running) >= max_workers:
+                break
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                item = running.pop(future)
+                # Start the next item before handing out the result, so the pool stays busy
+                for next_item in items:
+                    running[pool.submit(work, next_item)] = next_item
+                    break
+                yield item, future.result()
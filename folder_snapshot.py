@@ -0,0 +1,143 @@
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import logging
+import threading
+
+from folder_scanner import MAX_WORKERS, list_folder, machine_folders, scan_parallel
+from path_resolver import date_key, resolver
+
+logger = logging.getLogger("folder_snapshot")
+
+# Next to the code, so the snapshot history does not depend on the folder uvicorn runs from
+SNAPSHOT_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "folder_snapshots.db")
+
+# Snapshots kept per date, older ones are deleted when a new one is stored
+KEEP_SNAPSHOTS = 20
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    main_folder TEXT NOT NULL,
+    date TEXT NOT NULL,
+    created REAL NOT NULL,
+    root_hash TEXT NOT NULL,
+    tree TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS snapshots_date ON snapshots(main_folder, date);
+"""
+
+
+def hash_folder(path):
+    """Return the Merkle node of a folder: {"hash", "files": {name: [size, mtime_ns]}, "dirs": {name: node}}.
+
+    The hash covers the name, size and mtime of every file and the hash of every sub
+    folder, so two nodes with the same hash hold the same files all the way down.
+    """
+    dirs, files = list_folder(path)
+    node = {"files": {}, "dirs": {}}
+    for entry in files:
+        try:
+            stat = entry.stat()
+        except OSError:
+            continue
+        node["files"][entry.name] = [stat.st_size, stat.st_mtime_ns]
+    for entry in dirs:
+        if not entry.is_symlink():
+            node["dirs"][entry.name] = hash_folder(entry.path)
+    node["hash"] = _node_hash(node)
+    return node
+
+
+def _node_hash(node):
+    digest = hashlib.sha1()
+    for name in sorted(node["files"]):
+        size, mtime_ns = node["files"][name]
+        digest.update(f"f\0{name}\0{size}\0{mtime_ns}\n".encode("utf-8"))
+    for name in sorted(node["dirs"]):
+        digest.update(f"d\0{name}\0{node['dirs'][name]['hash']}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def snapshot_date(main_folder, target_date, max_workers=MAX_WORKERS):
+    """Return the Merkle tree of a date: one node per machine, keyed by the path of its date folders"""
+    def snapshot_machine(machine_folder):
+        return [(date_folder, hash_folder(date_folder))
+                for date_folder in resolver.date_folders(machine_folder, target_date)]
+
+    root = {"files": {}, "dirs": {}}
+    for date_folders in scan_parallel(machine_folders(main_folder), snapshot_machine, max_workers):
+        for date_folder, node in date_folders:
+            root["dirs"][os.path.relpath(date_folder, main_folder)] = node
+    root["hash"] = _node_hash(root)
+    return root
+
+
+def diff_trees(old, new, suffix=".pdf"):
+    """Return sorted (added, removed) relative file paths, only descending into folders whose hash changed"""
+    added = []
+    removed = []
+    _diff_nodes(old, new, "", suffix, added, removed)
+    return sorted(added), sorted(removed)
+
+
+def _diff_nodes(old, new, path, suffix, added, removed):
+    if old is not None and new is not None and old["hash"] == new["hash"]:
+        return
+    old_files = old["files"] if old is not None else {}
+    new_files = new["files"] if new is not None else {}
+    added.extend(os.path.join(path, name) for name in new_files
+                 if name not in old_files and name.lower().endswith(suffix))
+    removed.extend(os.path.join(path, name) for name in old_files
+                   if name not in new_files and name.lower().endswith(suffix))
+
+    old_dirs = old["dirs"] if old is not None else {}
+    new_dirs = new["dirs"] if new is not None else {}
+    for name in new_dirs.keys() | old_dirs.keys():
+        _diff_nodes(old_dirs.get(name), new_dirs.get(name), os.path.join(path, name), suffix, added, removed)
+
+
+class SnapshotStore:
+    """SQLite store of date snapshots, the last KEEP_SNAPSHOTS of each date are kept.
+
+    Dates are stored by date_key, so 2025_1_7 and 2025_01_07 share one history.
+    """
+
+    def __init__(self, snapshot_file=SNAPSHOT_FILE, keep=KEEP_SNAPSHOTS):
+        self.snapshot_file = snapshot_file
+        self.keep = keep
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(snapshot_file, check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+
+    def close(self):
+        self._conn.close()
+
+    def save(self, main_folder, target_date, tree):
+        """Store a snapshot and return its id"""
+        main_folder = os.path.normpath(main_folder)
+        target_date = date_key(target_date)
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO snapshots (main_folder, date, created, root_hash, tree) VALUES (?, ?, ?, ?, ?)",
+                (main_folder, target_date, time.time(), tree["hash"], json.dumps(tree, separators=(",", ":"))))
+            self._conn.execute(
+                "DELETE FROM snapshots WHERE main_folder = ? AND date = ? AND id NOT IN "
+                "(SELECT id FROM snapshots WHERE main_folder = ? AND date = ? ORDER BY id DESC LIMIT ?)",
+                (main_folder, target_date, main_folder, target_date, self.keep))
+            return cursor.lastrowid
+
+    def load(self, main_folder, target_date, snapshot_id=None):
+        """Return (id, created, tree) of a stored snapshot of the date, the latest if no id is given"""
+        query = "SELECT id, created, tree FROM snapshots WHERE main_folder = ? AND date = ?"
+        params = [os.path.normpath(main_folder), date_key(target_date)]
+        if snapshot_id is not None:
+            query += " AND id = ?"
+            params.append(snapshot_id)
+        with self._lock:
+            row = self._conn.execute(query + " ORDER BY id DESC LIMIT 1", params).fetchone()
+        if row is None:
+            return None
+        return row[0], row[1], json.loads(row[2])
@@ -0,0 +1,102 @@
+import os
+import time
+import threading
+from bisect import bisect_right
+from collections import OrderedDict
+
+from folder_scanner import list_folder
+
+
+class TtlCache:
+    """Small LRU cache whose entries are recomputed once they are older than ttl seconds"""
+
+    def __init__(self, ttl=10.0, max_size=256):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, compute):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[0] < self.ttl:
+                self._entries.move_to_end(key)
+                return entry[1]
+
+        value = compute()
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def resolve_inside(main_folder, relative_path):
+    """Join a relative path onto the main folder, raise ValueError if it points outside of it"""
+    main_folder = os.path.abspath(main_folder)
+    path = os.path.abspath(os.path.join(main_folder, relative_path or ""))
+    if os.path.commonpath([main_folder, path]) != main_folder:
+        raise ValueError(f"Path is outside of the main folder: {relative_path}")
+    return path
+
+
+class FolderTree:
+    """Expand a folder tree one level per call, a page of children at a time.
+
+    Listings are cached for ttl seconds, so paging through a big folder lists it once.
+    Children are sorted by name and the cursor is the last name of the previous page,
+    which stays valid when folders are added or removed between two requests.
+    """
+
+    def __init__(self, ttl=10.0, max_size=256):
+        self._listings = TtlCache(ttl, max_size)
+
+    def listing(self, path):
+        """Return (sorted [(name, is_dir)], dir count, file count) of a folder, cached"""
+        def compute():
+            dirs, files = list_folder(path)
+            children = sorted([(entry.name, True) for entry in dirs] + [(entry.name, False) for entry in files])
+            return children, len(dirs), len(files)
+        return self._listings.get(path, compute)
+
+    def page(self, main_folder, relative_path="", limit=50, cursor=None, counts=True):
+        """Return one page of the children of a folder below the main folder.
+
+        With counts, every child folder on the page gets its own dir and file counts,
+        which costs one (cached) listing per child folder.
+        """
+        path = resolve_inside(main_folder, relative_path)
+        if not os.path.isdir(path):
+            raise FileNotFoundError(f"Folder does not exist: {relative_path}")
+
+        children, dir_count, file_count = self.listing(path)
+        start = bisect_right(children, (cursor, True)) if cursor else 0
+        page = children[start:start + limit]
+        relative_base = os.path.relpath(path, os.path.abspath(main_folder))
+        if relative_base == ".":
+            relative_base = ""
+
+        items = []
+        for name, is_dir in page:
+            item = {"name": name, "path": os.path.join(relative_base, name), "is_dir": is_dir}
+            if is_dir and counts:
+                _, item["dir_count"], item["file_count"] = self.listing(os.path.join(path, name))
+            items.append(item)
+
+        has_more = start + limit < len(children)
+        return {
+            "path": relative_base,
+            "dir_count": dir_count,
+            "file_count": file_count,
+            "children": items,
+            "next_cursor": page[-1][0] if has_more and page else None,
+        }
+
+    def clear(self):
+        self._listings.clear()
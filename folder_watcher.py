@@ -0,0 +1,160 @@
+import os
+import logging
+import threading
+from collections import Counter
+from datetime import datetime
+
+from folder_scanner import list_folder
+from order_parser import parse_order
+from path_resolver import date_key
+
+logger = logging.getLogger("folder_watcher")
+
+# Seconds to wait before watching again after the watcher failed
+RESTART_DELAY = 5
+# Milliseconds the native watcher waits for events before yielding an empty batch
+WATCH_TIMEOUT_MS = 1000
+
+
+def today_key():
+    today = datetime.now()
+    return str(today.year) + "_" + str(today.month) + "_" + str(today.day)
+
+
+class _Day:
+    # Orders of one date: the order of every PDF path plus a count per (order_code, seller)
+    def __init__(self):
+        self.files = {}
+        self.orders = Counter()
+
+    def add(self, path):
+        if path in self.files:
+            return
+        order = parse_order(os.path.basename(path))
+        key = order.key if order is not None else None
+        self.files[path] = key
+        if key is not None:
+            self.orders[key] += 1
+
+    def remove(self, path):
+        key = self.files.pop(path, None)
+        if key is not None:
+            self.orders[key] -= 1
+            if self.orders[key] <= 0:
+                del self.orders[key]
+
+    def remove_folder(self, path):
+        prefix = path + os.sep
+        for file in [file for file in self.files if file.startswith(prefix)]:
+            self.remove(file)
+
+
+class FolderWatcher:
+    """Keep today's (order_code, seller) set in memory from file system events under the main folder.
+
+    `loader(date)` returns the PDF paths of a date and is used to fill a day the first time it is
+    asked for and again after the watcher restarts, since events may have been missed meanwhile.
+    """
+
+    def __init__(self, main_folder, loader):
+        self.main_folder = os.path.abspath(main_folder)
+        self.loader = loader
+        self._days = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._ready = False
+        self._thread = None
+
+    @property
+    def ready(self):
+        return self._ready
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="folder-watcher", daemon=True)
+        self._thread.start()
+        logger.info(f"Started watching {self.main_folder}")
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=RESTART_DELAY)
+        self._ready = False
+        logger.info(f"Stopped watching {self.main_folder}")
+
+    def get_orders(self, target_date):
+        """Return the live order set of a watched date, or None if the caller has to scan"""
+        if not self._ready:
+            return None
+        key = date_key(target_date)
+        with self._lock:
+            day = self._days.get(key)
+            if day is None:
+                if key != today_key():
+                    return None
+                day = self._load_day(key)
+            return set(day.orders)
+
+    def _load_day(self, key):
+        # Called with the lock held, so events for this date wait until the scan is done
+        logger.info(f"Loading orders of {key} for the watcher")
+        day = _Day()
+        for path in self.loader(key):
+            day.add(os.path.abspath(path))
+        # Only today is kept up to date, older days are answered by the scanner
+        self._days = {key: day}
+        return day
+
+    def _run(self):
+        from watchfiles import watch
+
+        while not self._stop.is_set():
+            try:
+                # With yield_on_timeout the first (possibly empty) batch comes once the native
+                # watcher is running, only then can days be loaded without missing events
+                for changes in watch(self.main_folder, stop_event=self._stop, raise_interrupt=False,
+                                     yield_on_timeout=True, rust_timeout=WATCH_TIMEOUT_MS):
+                    with self._lock:
+                        if not self._ready:
+                            self._days = {}
+                            self._ready = True
+                            logger.info(f"Watcher running on {self.main_folder}")
+                        # A batch is unordered, an add and a delete of one path are resolved by
+                        # looking at the path now instead of replaying them in arbitrary order
+                        for path in sorted({path for _, path in changes}):
+                            self._apply(not os.path.exists(path), path)
+            except Exception as e:
+                logger.error(f"Watcher error, falling back to scanning: {str(e)}")
+            # Events may have been lost, rebuild the days from the scanner on the next request
+            self._ready = False
+            with self._lock:
+                self._days = {}
+            if not self._stop.is_set():
+                self._stop.wait(RESTART_DELAY)
+
+    def _apply(self, deleted, path):
+        parts = os.path.relpath(path, self.main_folder).split(os.sep)
+        # <Machine N>/<YYYY_M>/<YYYY_M_D>/<batch>/<file>.pdf
+        if len(parts) < 3:
+            if deleted:
+                self._days = {}
+            return
+        day = self._days.get(date_key(parts[2]))
+        if day is None:
+            return
+
+        if len(parts) == 5 and path.lower().endswith(".pdf"):
+            if deleted:
+                day.remove(path)
+            else:
+                day.add(path)
+        elif deleted:
+            # A removed or moved away folder only reports itself, not the files inside
+            day.remove_folder(path)
+        elif len(parts) < 5 and os.path.isdir(path):
+            # A folder moved in with files already inside
+            batches = [path] if len(parts) == 4 else [entry.path for entry in list_folder(path)[0]]
+            for batch in batches:
+                for entry in list_folder(batch)[1]:
+                    if entry.name.lower().endswith(".pdf"):
+                        day.add(entry.path)
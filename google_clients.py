@@ -0,0 +1,136 @@
+import logging
+import threading
+
+import gspread
+from google.oauth2.service_account import Credentials
+from gspread.utils import extract_id_from_url
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger("google_clients")
+
+SCOPES = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
+# Keep-alive connections kept open to the Google APIs per client
+POOL_SIZE = 10
+
+
+def spreadsheet_id(key_or_url):
+    """Return the spreadsheet key of a key or of a docs.google.com URL"""
+    if key_or_url.startswith("http"):
+        return extract_id_from_url(key_or_url)
+    return key_or_url
+
+
+class GoogleClients:
+    """Authorized Google API clients of one service account, created once and reused.
+
+    The service account file is read once and its access token is reused until it
+    expires, the google-auth session refreshes it on its own. gspread, pygsheets and
+    googleapiclient clients are built on first use, and opened spreadsheets and
+    worksheets are kept by key so repeated calls skip the metadata round-trips.
+    """
+
+    def __init__(self, credentials_file, scopes=SCOPES):
+        self.credentials_file = credentials_file
+        self.scopes = list(scopes)
+        self._lock = threading.RLock()
+        self._credentials = None
+        self._gspread = None
+        self._pygsheets = None
+        self._services = threading.local()
+        self._spreadsheets = {}
+        self._worksheets = {}
+
+    @property
+    def credentials(self):
+        with self._lock:
+            if self._credentials is None:
+                self._credentials = Credentials.from_service_account_file(self.credentials_file,
+                                                                          scopes=self.scopes)
+                logger.info(f"Loaded service account credentials from {self.credentials_file}")
+            return self._credentials
+
+    def gspread(self):
+        """Return the shared gspread client"""
+        with self._lock:
+            if self._gspread is None:
+                client = gspread.authorize(self.credentials)
+                # gspread 6 keeps its session on client.http_client, older versions on the client
+                session = getattr(getattr(client, "http_client", client), "session", None)
+                if session is not None:
+                    session.mount("https://", HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE))
+                self._gspread = client
+            return self._gspread
+
+    def pygsheets(self):
+        """Return the shared pygsheets client"""
+        import pygsheets
+
+        with self._lock:
+            if self._pygsheets is None:
+                self._pygsheets = pygsheets.authorize(custom_credentials=self.credentials)
+            return self._pygsheets
+
+    def service(self, api, version):
+        """Return a googleapiclient service, one per thread because httplib2 is not thread-safe"""
+        from googleapiclient.discovery import build
+
+        services = getattr(self._services, "services", None)
+        if services is None:
+            services = self._services.services = {}
+        if (api, version) not in services:
+            services[(api, version)] = build(api, version, credentials=self.credentials, cache_discovery=False)
+        return services[(api, version)]
+
+    def spreadsheet(self, key_or_url):
+        """Return the gspread Spreadsheet of a key or URL, opened once"""
+        key = spreadsheet_id(key_or_url)
+        with self._lock:
+            if key not in self._spreadsheets:
+                self._spreadsheets[key] = self.gspread().open_by_key(key)
+            return self._spreadsheets[key]
+
+    def worksheet(self, key_or_url, title, create_rows=None, create_cols=None):
+        """Return a gspread Worksheet by title, opened once.
+
+        If create_rows and create_cols are given a missing worksheet is created with that
+        size, otherwise gspread.WorksheetNotFound is raised.
+        """
+        key = spreadsheet_id(key_or_url)
+        with self._lock:
+            worksheet = self._worksheets.get((key, title))
+            if worksheet is None:
+                spreadsheet = self.spreadsheet(key)
+                try:
+                    worksheet = spreadsheet.worksheet(title)
+                except gspread.WorksheetNotFound:
+                    if create_rows is None or create_cols is None:
+                        raise
+                    logger.warning(f"Sheet '{title}' does not exist, creating new one")
+                    worksheet = spreadsheet.add_worksheet(title=title, rows=create_rows, cols=create_cols)
+                self._worksheets[(key, title)] = worksheet
+            return worksheet
+
+    def forget(self, key_or_url=None):
+        """Drop the cached spreadsheet and worksheet handles of one spreadsheet, or of all"""
+        with self._lock:
+            if key_or_url is None:
+                self._spreadsheets.clear()
+                self._worksheets.clear()
+                return
+            key = spreadsheet_id(key_or_url)
+            self._spreadsheets.pop(key, None)
+            for cached in [cached for cached in self._worksheets if cached[0] == key]:
+                del self._worksheets[cached]
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_clients(credentials_file, scopes=SCOPES):
+    """Return the shared GoogleClients of a service account file"""
+    with _clients_lock:
+        key = (credentials_file, tuple(scopes))
+        if key not in _clients:
+            _clients[key] = GoogleClients(credentials_file, scopes)
+        return _clients[key]
@@ -3,8 +3,7 @@ import pandas as pd
 import json
 import time
 import io
-from googleapiclient.discovery import build
-from google.oauth2.service_account import Credentials
+from google_clients import get_clients
 from googleapiclient.http import MediaFileUpload
 
 
@@ -38,13 +37,10 @@ class GoogleSheetImageImporter:
                 'https://www.googleapis.com/auth/drive'
             ]
 
-            # Load service account credentials from JSON file
-            creds = Credentials.from_service_account_file(
-                self.credentials_path, scopes=SCOPES)
-
-            # Create services to interact with Google APIs
-            self.sheets_service = build('sheets', 'v4', credentials=creds)
-            self.drive_service = build('drive', 'v3', credentials=creds)
+            # Shared clients, the credentials are loaded once for both services
+            clients = get_clients(self.credentials_path, SCOPES)
+            self.sheets_service = clients.service('sheets', 'v4')
+            self.drive_service = clients.service('drive', 'v3')
 
             # Get data from Sheet
             sheet = self.sheets_service.spreadsheets()
@@ -0,0 +1,97 @@
+import time
+import threading
+from contextlib import contextmanager
+
+# Upper bounds in seconds of the histogram buckets, from a cached lookup to a full day rescan
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels, extra=()):
+    items = list(labels) + list(extra)
+    if not items:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in items) + "}"
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metrics:
+    """Thread-safe counters, gauges and histograms rendered in the Prometheus text format.
+
+    Every metric is declared once with describe(), samples are then keyed by their labels.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._meta = {}
+        self._values = {}
+        self._histograms = {}
+
+    def describe(self, name, kind, help_text, buckets=DEFAULT_BUCKETS):
+        """Declare a metric, kind is "counter", "gauge" or "histogram" """
+        with self._lock:
+            self._meta[name] = (kind, help_text, tuple(buckets))
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + value
+
+    def set(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._values[key] = value
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            buckets = self._meta[name][2]
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = [[0] * len(buckets), 0.0, 0]
+            for i, bound in enumerate(buckets):
+                if value <= bound:
+                    histogram[0][i] += 1
+            histogram[1] += value
+            histogram[2] += 1
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """Observe the seconds spent in the with block, also when it raises"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def render(self):
+        """Return every metric in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            for name, (kind, help_text, buckets) in sorted(self._meta.items()):
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                if kind == "histogram":
+                    for (sample, labels), (counts, total, count) in sorted(self._histograms.items()):
+                        if sample != name:
+                            continue
+                        for bound, bucket_count in zip(buckets, counts):
+                            lines.append(f"{name}_bucket{_format_labels(labels, [('le', bound)])} {bucket_count}")
+                        lines.append(f"{name}_bucket{_format_labels(labels, [('le', '+Inf')])} {count}")
+                        lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(total)}")
+                        lines.append(f"{name}_count{_format_labels(labels)} {count}")
+                else:
+                    for (sample, labels), value in sorted(self._values.items()):
+                        if sample == name:
+                            lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+# Shared registry of the API process
+metrics = Metrics()
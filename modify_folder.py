@@ -1,6 +1,7 @@
 import datetime
 import os
-import shutil
+from move_engine import MoveEngine
+from path_resolver import machine_path, resolve_date_folders
 
 # from fastapi import FastAPI
 
@@ -11,7 +12,6 @@ today = datetime.datetime.now()
 DROPBOX_PATH = r"D:\FlashPOD Dropbox"
 BACKUP_PATH = DROPBOX_PATH + r"\BackupFlashPOD"
 FLASHPOD_PATH = DROPBOX_PATH + r"\FlashPOD"
-FOLDER_DIR = str(today.year) + "_" + str(today.month)
 
 # ---------------Nhập tên folder muốn chuyển----------------------
 FOLDER_NAME = "2024_12_7"
@@ -19,13 +19,23 @@ FOLDER_NAME = "2024_12_7"
 
 
 # app.get("/move_folder/{folder_name}")
+moves = []
 for machine in range(1, 43):  # Machine 1 to 42
     # print(machine)
     machine_name = "Machine " + str(machine)
-    src_path = os.path.join(FLASHPOD_PATH, machine_name, FOLDER_DIR)
+    # Folder tháng được tính từ FOLDER_NAME, không cần liệt kê các folder tháng
+    src_paths = resolve_date_folders(machine_path(FLASHPOD_PATH, machine), FOLDER_NAME)
     des_path = os.path.join(BACKUP_PATH, machine_name)
-    try:
-        shutil.move(os.path.join(src_path, FOLDER_NAME), des_path)
-    except Exception as e:
-        print(e)
+    if not src_paths:
+        print(f"{machine_name}: không tìm thấy folder {FOLDER_NAME}")
+    for src_path in src_paths:
+        moves.append((src_path, os.path.join(des_path, os.path.basename(src_path))))
     # print(os.path.join(src_path, FOLDER_NAME), des_path)
+
+# Journal ghi lại các folder đã chuyển xong, chạy lại script sẽ tiếp tục từ chỗ bị dừng
+engine = MoveEngine(os.path.join(BACKUP_PATH, "move_journal_" + FOLDER_NAME + ".jsonl"))
+result = engine.move_all(moves)
+for src_path, des_path, error in result["failed"]:
+    print("Lỗi:", src_path, "->", des_path, ":", error)
+print("Đã chuyển:", len(result["moved"]), "- Bỏ qua (đã chuyển trước đó):", len(result["skipped"]),
+      "- Lỗi:", len(result["failed"]))
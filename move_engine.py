@@ -0,0 +1,184 @@
+import os
+import json
+import shutil
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger("move_engine")
+
+# Files or folders copied at the same time when source and destination are on different disks
+MAX_WORKERS = 8
+
+
+class MoveError(Exception):
+    """Raised when a moved file or folder does not match its source"""
+
+
+def tree_size(path):
+    """Return (total bytes, file count) of a file or of every file below a folder"""
+    if not os.path.isdir(path):
+        return os.path.getsize(path), 1
+    total = 0
+    count = 0
+    for root, _, files in os.walk(path):
+        for file in files:
+            total += os.path.getsize(os.path.join(root, file))
+            count += 1
+    return total, count
+
+
+def same_device(source, destination):
+    """True if source and the folder receiving destination are on the same disk"""
+    try:
+        return os.stat(source).st_dev == os.stat(os.path.dirname(destination)).st_dev
+    except OSError:
+        return False
+
+
+class MoveJournal:
+    """Append-only journal of finished moves, so an interrupted run can skip them when restarted.
+
+    It only lives until a run finishes without failures, then it is cleared, so a later run
+    for the same folders (late files after archiving) moves them again.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.done = set()
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as file:
+                for line in file:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # The last line can be cut short if the previous run was killed while writing
+                        continue
+                    self.done.add((entry["source"], entry["destination"]))
+
+    def is_done(self, source, destination):
+        return (source, destination) in self.done
+
+    def clear(self):
+        with self._lock:
+            self.done.clear()
+            if self.path and os.path.exists(self.path):
+                os.remove(self.path)
+
+    def record(self, source, destination, size, mode=None):
+        with self._lock:
+            self.done.add((source, destination))
+            if self.path:
+                entry = {"source": source, "destination": destination, "size": size}
+                if mode is not None:
+                    entry["mode"] = mode
+                with open(self.path, "a", encoding="utf-8") as file:
+                    file.write(json.dumps(entry) + "\n")
+
+
+class MoveEngine:
+    """Move files or folders to new full paths.
+
+    Moves on the same disk are a single os.replace. Moves across disks copy, check the
+    size of the copy and only then delete the source, several at a time. Every finished
+    move is written to the journal, which is dropped once a run ends without failures.
+    """
+
+    def __init__(self, journal_path=None, max_workers=MAX_WORKERS):
+        self.journal = MoveJournal(journal_path)
+        self.max_workers = max_workers
+
+    def move_all(self, moves):
+        """Move every (source, destination) pair, return {"moved": [...], "skipped": [...], "failed": [...]}"""
+        result = {"moved": [], "skipped": [], "failed": []}
+        pending = []
+        for source, destination in moves:
+            source, destination = str(source), str(destination)
+            # A journaled pair whose source is back (late files) is moved again, merged into the destination
+            if self.journal.is_done(source, destination) and not os.path.exists(source):
+                result["skipped"].append((source, destination))
+            else:
+                pending.append((source, destination))
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            outcomes = pool.map(lambda move: self._try_move(*move), pending)
+            for (source, destination), error in zip(pending, outcomes):
+                if error is None:
+                    result["moved"].append((source, destination))
+                else:
+                    result["failed"].append((source, destination, error))
+
+        logger.info(f"Moved {len(result['moved'])}, skipped {len(result['skipped'])} already done, "
+                    f"failed {len(result['failed'])}")
+        if not result["failed"]:
+            # Nothing left to resume
+            self.journal.clear()
+        return result
+
+    def _try_move(self, source, destination):
+        try:
+            self.move(source, destination)
+            return None
+        except Exception as e:
+            logger.error(f"Error moving {source} -> {destination}: {str(e)}")
+            return str(e)
+
+    def move(self, source, destination):
+        """Move one file or folder to its new full path and record it in the journal.
+
+        Like REPLACE_EXISTING in ZZ.java an existing destination file is replaced. An existing
+        destination folder is merged with the source folder, files inside it are replaced one
+        by one. The journal records which of rename, copy, replace and merge was used.
+        """
+        if not os.path.exists(source):
+            # Moved by a run that was stopped before it could write the journal
+            if os.path.exists(destination):
+                self.journal.record(source, destination, tree_size(destination)[0])
+                return
+            raise FileNotFoundError(f"Source does not exist: {source}")
+
+        os.makedirs(os.path.dirname(destination), exist_ok=True)
+        size, mode = self._move(source, destination)
+        self.journal.record(source, destination, size, mode)
+
+    def _move(self, source, destination):
+        # Return (bytes moved, mode) of one file or folder
+        if os.path.isdir(source) != os.path.isdir(destination) and os.path.exists(destination):
+            raise MoveError(f"Cannot replace {'a folder' if os.path.isdir(destination) else 'a file'} "
+                            f"with {source}: {destination}")
+        if os.path.isdir(destination):
+            total = 0
+            with os.scandir(source) as entries:
+                for entry in list(entries):
+                    total += self._move(entry.path, os.path.join(destination, entry.name))[0]
+            os.rmdir(source)
+            return total, "merge"
+
+        replace = os.path.exists(destination)
+        expected = tree_size(source)
+        if same_device(source, destination):
+            # os.replace overwrites an existing file, os.rename does not on Windows
+            os.replace(source, destination)
+            mode = "rename"
+        else:
+            self._copy_and_verify(source, destination, expected)
+            mode = "copy"
+
+        size = tree_size(destination)
+        if size != expected:
+            raise MoveError(f"Size mismatch after moving {source}: expected {expected}, got {size}")
+        return size[0], "replace" if replace else mode
+
+    def _copy_and_verify(self, source, destination, expected):
+        if os.path.isdir(source):
+            shutil.copytree(source, destination, dirs_exist_ok=True)
+        else:
+            shutil.copy2(source, destination)
+        copied = tree_size(destination)
+        if copied != expected:
+            raise MoveError(f"Copy of {source} is {copied}, expected {expected}, source kept")
+        if os.path.isdir(source):
+            shutil.rmtree(source)
+        else:
+            os.remove(source)
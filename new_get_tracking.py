@@ -5,7 +5,7 @@ from urllib.parse import urlparse
 
 import cv2
 import numpy as np
-import pygsheets
+from google_clients import get_clients
 import requests
 from pdf2image import convert_from_path
 import pyzbar.pyzbar
@@ -59,7 +59,7 @@ def get_filename_from_url(url):
 
 def get_worksheet_from_ggsheet(sheet_id: str, file_json: str):
     sheet_name = input("Tên sheet: ")
-    gc = pygsheets.authorize(service_account_file=file_json)
+    gc = get_clients(file_json).pygsheets()
     spreadsheet = gc.open_by_key(sheet_id)
     worksheet = spreadsheet.worksheet_by_title(sheet_name.strip())
     return worksheet
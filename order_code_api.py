@@ -1,13 +1,30 @@
 import os
-import gspread
+import asyncio
 import logging
 import sys
+import time
+from bisect import bisect_right
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException, Query
 from pydantic import BaseModel
-from oauth2client.service_account import ServiceAccountCredentials
 from typing import List, Optional
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from datetime import datetime
+from order_index import OrderIndex
+from path_resolver import date_formats, date_key, date_range
+from order_table import COLUMNS, OrderTable, order_records
+from folder_watcher import FolderWatcher
+from folder_scanner import iter_parallel
+from result_cache import ResultCache
+from scan_executor import QueueFull, ScanExecutor
+from folder_tree import FolderTree, TtlCache
+from folder_snapshot import SNAPSHOT_FILE, SnapshotStore, diff_trees, snapshot_date
+from order_lookup import IndexBuilding, OrderLookup
+from metrics import metrics
+from google_clients import get_clients
+from sheet_sync import SYNC_STATE_FILE, SheetSync
 
 # Configure logging with UTF-8 encoding
 logging.basicConfig(
@@ -20,8 +37,16 @@ logging.basicConfig(
 )
 logger = logging.getLogger("order_api")
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    start_folder_watcher()
+    yield
+    stop_background_work()
+
+
 app = FastAPI(title="Order Code Extraction API",
-              description="API to extract order codes from PDF files and update to Google Sheets")
+              description="API to extract order codes from PDF files and update to Google Sheets",
+              lifespan=lifespan)
 
 # Enable CORS
 app.add_middleware(
@@ -36,7 +61,27 @@ app.add_middleware(
 DEFAULT_CONFIG = dict(SHEET_KEY="1kNMeY5JrRbvocmYktfWOoWJUamW6W8AQNATDgjgtGW0",
                       SHEET_NAME="Get_Orders_Code",
                       MAIN_FOLDER="D:\\Test_order_code_api",
-                      CREDENTIALS_FILE="decent-trail-451507-d7-d59973874d84.json")
+                      # BackupFlashPOD searched by /orders, left out while empty (the responses say so)
+                      BACKUP_FOLDER="",
+                      CREDENTIALS_FILE="decent-trail-451507-d7-d59973874d84.json",
+                      # None keeps one index file per main folder next to the code
+                      INDEX_FILE=None,
+                      SNAPSHOT_FILE=SNAPSHOT_FILE,
+                      SYNC_STATE_FILE=SYNC_STATE_FILE,
+                      # "delta" writes only the changed rows, "rewrite" clears the sheet and writes everything
+                      SHEET_SYNC_MODE="delta",
+                      WATCH_MODE=False,
+                      CACHE_SIZE=64,
+                      SCAN_WORKERS=4,
+                      SCAN_QUEUE=16)
+
+# Dates of a /extract/range request scanned at the same time
+RANGE_WORKERS = 4
+# Longest span of days /extract/range and /stats accept
+MAX_RANGE_DAYS = 93
+
+# Seconds the debug endpoints reuse a folder listing, so paging does not rescan
+DEBUG_CACHE_SECONDS = 10
 
 
 # Data models
@@ -45,101 +90,236 @@ class OrderCode(BaseModel):
     seller: str
 
 
+class DatedOrderCode(OrderCode):
+    date: str
+
+
 class ExtractionResult(BaseModel):
     date: str
     total_orders: int
     order_list: List[OrderCode]
     message: str
+    timings: Optional[dict] = None
 
 
 class UpdateConfig(BaseModel):
     sheet_key: Optional[str] = None
     sheet_name: Optional[str] = None
     folder_path: Optional[str] = None
+    backup_folder_path: Optional[str] = None
     credentials_file: Optional[str] = None
 
 
+# Metrics exposed on /metrics
+metrics.describe("order_extract_requests_total", "counter", "Extractions by where the order codes came from")
+metrics.describe("order_extract_seconds", "histogram", "Time to extract the order codes of a date")
+metrics.describe("order_index_refresh_seconds", "histogram", "Time of an order index refresh")
+metrics.describe("order_scan_machine_seconds", "gauge", "Time the last refresh spent on a machine folder")
+metrics.describe("order_scan_machine_seconds_total", "counter", "Time refreshes spent on a machine folder")
+metrics.describe("order_scan_dirs_checked_total", "counter", "Folders stat'ed by index refreshes")
+metrics.describe("order_scan_dirs_listed_total", "counter", "Folders listed by index refreshes because they changed")
+metrics.describe("order_scan_files_total", "counter", "PDF files read by index refreshes")
+metrics.describe("order_scan_files_per_second", "gauge", "PDF files per second of the last refresh of a machine")
+metrics.describe("sheets_call_seconds", "histogram", "Latency of Google Sheets calls")
+metrics.describe("sheets_call_errors_total", "counter", "Failed Google Sheets calls")
+metrics.describe("result_cache", "gauge", "Extraction result cache counters")
+metrics.describe("result_cache_hit_ratio", "gauge", "Share of extraction result cache lookups that were hits")
+metrics.describe("scan_executor", "gauge", "Scan executor counters")
+metrics.describe("order_lookup", "gauge", "Order lookup index size, age and build failures")
+
+
+def record_refresh(stats, seconds):
+    metrics.observe("order_index_refresh_seconds", seconds)
+    for machine, machine_stats in stats["machines"].items():
+        metrics.set("order_scan_machine_seconds", machine_stats["seconds"], machine=machine)
+        metrics.inc("order_scan_machine_seconds_total", machine_stats["seconds"], machine=machine)
+        metrics.inc("order_scan_dirs_checked_total", machine_stats["checked"], machine=machine)
+        metrics.inc("order_scan_dirs_listed_total", machine_stats["listed"], machine=machine)
+        metrics.inc("order_scan_files_total", machine_stats["files"], machine=machine)
+        if machine_stats["seconds"] > 0:
+            metrics.set("order_scan_files_per_second", machine_stats["files"] / machine_stats["seconds"],
+                        machine=machine)
+
+
+# Order index shared by all requests, recreated when the main folder changes
+_order_index = None
+
+
+def get_order_index(main_folder: str) -> OrderIndex:
+    global _order_index
+    if _order_index is None or _order_index.main_folder != os.path.normpath(main_folder):
+        if _order_index is not None:
+            _order_index.close()
+        _order_index = OrderIndex(main_folder, DEFAULT_CONFIG["INDEX_FILE"])
+    return _order_index
+
+
+# Folder snapshots of each date for /diff, opened on first use
+_snapshot_store = None
+
+
+def get_snapshot_store() -> SnapshotStore:
+    global _snapshot_store
+    if _snapshot_store is None:
+        _snapshot_store = SnapshotStore(DEFAULT_CONFIG["SNAPSHOT_FILE"])
+    return _snapshot_store
+
+
+# Last pushed rows of each sheet for the delta sheet sync, opened on first use
+_sheet_sync = None
+
+
+def get_sheet_sync() -> SheetSync:
+    global _sheet_sync
+    if _sheet_sync is None:
+        _sheet_sync = SheetSync(DEFAULT_CONFIG["SYNC_STATE_FILE"])
+    return _sheet_sync
+
+
+# Results of past extractions, checked against the date folder mtimes
+result_cache = ResultCache(DEFAULT_CONFIG["CACHE_SIZE"])
+
+
+# Scans run on their own pool so "/" and "/sheets" keep answering under heavy scan load
+scan_executor = ScanExecutor(DEFAULT_CONFIG["SCAN_WORKERS"], DEFAULT_CONFIG["SCAN_QUEUE"])
+
+
+# Order code -> location index over the main and backup folders for /orders, built on the scan executor
+order_lookup = OrderLookup(submit=lambda key, fn, *args: scan_executor.submit(key, fn, *args,
+                                                                             reject_when_full=False))
+
+
+def lookup_roots():
+    """Return {source: root} of the folders /orders searches, BackupFlashPOD only once BACKUP_FOLDER is set"""
+    roots = {"FlashPOD": DEFAULT_CONFIG["MAIN_FOLDER"], "BackupFlashPOD": DEFAULT_CONFIG["BACKUP_FOLDER"]}
+    return {source: root for source, root in roots.items() if root}
+
+
+def get_lookup_index():
+    try:
+        return order_lookup.get(lookup_roots())
+    except IndexBuilding as e:
+        # The first walk of FlashPOD and the backup takes a while, clients retry instead of waiting
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "10"})
+
+
+def lookup_sources():
+    """The searched sources of an /orders response, with a warning when the backup is left out"""
+    result = {"sources": sorted(lookup_roots())}
+    if not DEFAULT_CONFIG["BACKUP_FOLDER"]:
+        result["warning"] = "BACKUP_FOLDER is not configured, BackupFlashPOD is not searched"
+    return result
+
+
+# Short-lived listings behind the debug endpoints
+folder_tree = FolderTree(DEBUG_CACHE_SECONDS)
+debug_folder_cache = TtlCache(DEBUG_CACHE_SECONDS, max_size=32)
+
+
+# Folder watcher keeping today's orders in memory, only running in watch mode
+_folder_watcher = None
+
+
+def get_folder_watcher(main_folder: str) -> Optional[FolderWatcher]:
+    global _folder_watcher
+    if not DEFAULT_CONFIG["WATCH_MODE"]:
+        return None
+    if _folder_watcher is None or _folder_watcher.main_folder != os.path.abspath(main_folder):
+        if _folder_watcher is not None:
+            _folder_watcher.stop()
+
+        def load_date_pdfs(target_date):
+            index = get_order_index(main_folder)
+            index.refresh(target_date)
+            return [os.path.join(folder, name) for _, _, name, folder in index.get_pdfs(target_date)]
+
+        _folder_watcher = FolderWatcher(main_folder, load_date_pdfs)
+        _folder_watcher.start()
+    return _folder_watcher
+
+
+def start_folder_watcher():
+    main_folder = DEFAULT_CONFIG["MAIN_FOLDER"]
+    if DEFAULT_CONFIG["WATCH_MODE"] and os.path.isdir(main_folder):
+        get_folder_watcher(main_folder)
+
+
+def stop_background_work():
+    if _folder_watcher is not None:
+        _folder_watcher.stop()
+    scan_executor.shutdown()
+
+
 # Function to extract order codes
-def extract_order_codes(main_folder: str, target_date: str):
+def extract_order_codes(main_folder: str, target_date: str, timings: Optional[dict] = None):
     logger.info(f"Starting order code extraction for date {target_date} from folder {main_folder}")
-    order_data = set()
 
     # Check if the main folder exists
     if not os.path.exists(main_folder):
         logger.error(f"Main folder does not exist: {main_folder}")
         raise HTTPException(status_code=400, detail=f"Main folder does not exist: {main_folder}")
 
-    # Iterate through all "Machine X" folders in the main folder
-    logger.info(f"Found main folder, starting scan of subfolders")
-    for machine_folder in os.listdir(main_folder):
-        machine_path = os.path.join(main_folder, machine_folder)
-
-        # Check if it is a folder (skip files)
-        if os.path.isdir(machine_path):
-            logger.info(f"Scanning machine folder: {machine_folder}")
-            # Iterate through month folders (e.g., "2025_2")
-            for month_folder in os.listdir(machine_path):
-                month_path = os.path.join(machine_path, month_folder)
-
-                # Check if the month folder is a directory
-                if os.path.isdir(month_path):
-                    logger.debug(f"Scanning month folder: {month_folder}")
-                    # Try both formats: with and without leading zeros
-                    # Example: try both "2025_3_1" and "2025_03_01"
-                    date_formats = [target_date]
-
-                    # Split and prepare alternative format
-                    parts = target_date.split("_")
-                    if len(parts) == 3:
-                        year, month, day = parts
-                        # Add format with leading zeros removed
-                        alternative_format = f"{year}_{int(month)}_{int(day)}"
-                        if alternative_format != target_date:
-                            date_formats.append(alternative_format)
-
-                    for date_format in date_formats:
-                        date_folder_path = os.path.join(month_path, date_format)
-
-                        # If the target date folder exists
-                        if os.path.isdir(date_folder_path):
-                            logger.info(f"✅ Found date folder: {date_folder_path}")
-
-                            # Iterate through all subfolders in the date folder
-                            for subfolder in os.listdir(date_folder_path):
-                                subfolder_path = os.path.join(date_folder_path, subfolder)
-
-                                if os.path.isdir(subfolder_path):
-                                    logger.info(f"  🔍 Scanning subfolder: {subfolder_path}")
-
-                                    # Scan all PDF files in the subfolder
-                                    for file in os.listdir(subfolder_path):
-                                        if file.lower().endswith(".pdf"):
-                                            file_name = file.replace(".pdf", "").replace("-", "_")  # Replace '-' with '_'
-                                            parts = file_name.split("_")  # Split into components
-
-                                            # Check the number of components in the list
-                                            if len(parts) <= 9:
-                                                order_code = "UNKNOWN"
-                                                seller = "UNKNOWN"
-                                            else:
-                                                if parts[5] == "1":
-                                                    order_code = parts[2]
-                                                else:
-                                                    order_code = parts[0]
-
-                                                # Get seller name at position [7]
-                                                seller = parts[7] if len(parts) > 7 else "UNKNOWN"
-
-                                            # If order_code is valid, add to the set (to remove duplicates)
-                                            if order_code != "UNKNOWN":
-                                                order_data.add((order_code, seller))
-                                                logger.debug(
-                                                    f"      📄 {file} → Order code: {order_code}, Seller: {seller}")
+    # In watch mode today's orders are kept up to date in memory
+    watcher = get_folder_watcher(main_folder)
+    if watcher is not None:
+        order_data = watcher.get_orders(target_date)
+        if order_data is not None:
+            logger.info(f"Returned {len(order_data)} unique order codes from the folder watcher")
+            metrics.inc("order_extract_requests_total", source="watcher")
+            if timings is not None:
+                timings["source"] = "watcher"
+            return order_data
+
+    source = "cache"
+
+    def scan():
+        # Rescan only the folders of this date that changed since the last request
+        nonlocal source
+        source = "scan"
+        logger.info(f"Refreshing order index for {target_date}")
+        index = get_order_index(main_folder)
+        start = time.perf_counter()
+        stats = index.refresh(target_date)
+        refresh_seconds = time.perf_counter() - start
+        record_refresh(stats, refresh_seconds)
+        if timings is not None:
+            timings["index_refresh"] = refresh_seconds
+            timings["dirs_checked"] = stats["checked"]
+            timings["dirs_listed"] = stats["listed"]
+            timings["files_read"] = stats["files"]
+            timings["machines"] = {machine: machine_stats["seconds"]
+                                   for machine, machine_stats in stats["machines"].items()}
+        return frozenset(index.get_orders(target_date))
+
+    order_data = result_cache.get(main_folder, target_date, scan)
+    metrics.inc("order_extract_requests_total", source=source)
+    if timings is not None:
+        timings["source"] = source
 
     logger.info(f"Extracted {len(order_data)} unique order codes")
     return order_data
 
 
+# Extract order codes and return them with the time spent in each step, used through the scan executor
+def timed_extract(main_folder: str, target_date: str):
+    timings = {}
+    start = time.perf_counter()
+    order_data = extract_order_codes(main_folder, target_date, timings)
+    timings["extract"] = time.perf_counter() - start
+    metrics.observe("order_extract_seconds", timings["extract"])
+    return order_data, timings
+
+
+# Call a Google Sheets function and record its latency
+def timed_sheets_call(operation: str, fn, *args):
+    try:
+        with metrics.timer("sheets_call_seconds", operation=operation):
+            return fn(*args)
+    except Exception:
+        metrics.inc("sheets_call_errors_total", operation=operation)
+        raise
+
+
 # Get the list of all sheet names
 def get_sheet_list(sheet_key: str, credentials_file: str):
     try:
@@ -148,13 +328,8 @@ def get_sheet_list(sheet_key: str, credentials_file: str):
             logger.error(f"Credentials file does not exist: {credentials_file}")
             raise HTTPException(status_code=400, detail=f"Credentials file does not exist: {credentials_file}")
 
-        # Authenticate Google Sheets API
-        scope = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
-        creds = ServiceAccountCredentials.from_json_keyfile_name(credentials_file, scope)
-        client = gspread.authorize(creds)
-
-        # Open Google Sheet and get all worksheet names
-        spreadsheet = client.open_by_key(sheet_key)
+        # Shared client, the credentials and the opened spreadsheet are reused between requests
+        spreadsheet = get_clients(credentials_file).spreadsheet(sheet_key)
         worksheets = spreadsheet.worksheets()
 
         sheet_list = [sheet.title for sheet in worksheets]
@@ -176,39 +351,26 @@ def update_google_sheet(sheet_key: str, sheet_name: str, credentials_file: str,
             logger.error(f"Credentials file does not exist: {credentials_file}")
             raise HTTPException(status_code=400, detail=f"Credentials file does not exist: {credentials_file}")
 
-        # Authenticate Google Sheets API
-        scope = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
-        creds = ServiceAccountCredentials.from_json_keyfile_name(credentials_file, scope)
-        client = gspread.authorize(creds)
-
-        # Open Google Sheet
-        spreadsheet = client.open_by_key(sheet_key)
+        # Shared client, the worksheet handle is reused and created if it does not exist
+        clients = get_clients(credentials_file)
+        sheet = clients.worksheet(sheet_key, sheet_name, create_rows=1000, create_cols=20)
 
-        # Get list of existing sheets
-        sheet_list = [sheet.title for sheet in spreadsheet.worksheets()]
-        logger.info(f"Existing sheets: {sheet_list}")
-
-        # Check if sheet_name exists
-        if sheet_name not in sheet_list:
-            logger.warning(f"Sheet '{sheet_name}' does not exist, creating new one")
-            spreadsheet.add_worksheet(title=sheet_name, rows=1000, cols=20)
-
-        sheet = spreadsheet.worksheet(sheet_name)
-        sheet.clear()
-
-        # Write date to cell A1
-        sheet.update("A1", [[target_date]])
-        logger.info(f"Updated date {target_date} in cell A1")
-
-        # Convert set to list and write to Google Sheet
-        if order_data:
-            logger.info(f"Updating {len(order_data)} order codes to sheet")
-            sheet.update("A2", list(order_data))
-            logger.info("Google Sheet updated successfully")
+        # Sorted so the rows of the same day stay in place between runs and the diff stays small
+        rows = [[target_date]] + [list(order) for order in sorted(order_data)]
+        if DEFAULT_CONFIG["SHEET_SYNC_MODE"] == "delta":
+            written = get_sheet_sync().sync(sheet, rows)
+            logger.info(f"Google Sheet synced, {written} of {len(rows)} rows written")
+        else:
+            sheet.clear()
+            sheet.update("A1", rows)
+            get_sheet_sync().forget(sheet)
+            logger.info(f"Google Sheet rewritten with date {target_date} and {len(order_data)} order codes")
 
         return True
     except Exception as e:
         logger.error(f"Error updating Google Sheet: {str(e)}")
+        # The cached handles may point at a sheet that was deleted or renamed, reopen next time
+        get_clients(credentials_file).forget(sheet_key)
         raise HTTPException(status_code=500, detail=f"Failed to update Google Sheet: {str(e)}")
 
 
@@ -223,7 +385,7 @@ def get_all_sheets():
     """Retrieve the list of all sheets in Google Sheets"""
     logger.info("Request to retrieve all sheets")
     try:
-        sheets = get_sheet_list(
+        sheets = timed_sheets_call("list_sheets", get_sheet_list,
             DEFAULT_CONFIG["SHEET_KEY"],
             DEFAULT_CONFIG["CREDENTIALS_FILE"]
         )
@@ -243,17 +405,24 @@ def get_all_sheets():
 
 
 @app.get("/extract", response_model=ExtractionResult, tags=["Extraction"])
-def extract_orders(
+async def extract_orders(
         date: str = Query(..., description="Date to scan in YYYY_M_D format (e.g., 2025_2_15 or 2025_02_15)"),
-        update_sheet: bool = Query(True, description="Whether to update Google Sheet or not")):
+        update_sheet: bool = Query(True, description="Whether to update Google Sheet or not"),
+        timings: bool = Query(False, description="Add the time spent in each step to the response")):
     logger.info(f"Request to extract order codes for date: {date}, update sheet: {update_sheet}")
     try:
         main_folder = DEFAULT_CONFIG["MAIN_FOLDER"]
         start_time = datetime.now()
 
-        # Extract order codes
+        # Extract order codes on the scan executor, sharing the scan with identical requests in flight
         try:
-            order_data = extract_order_codes(main_folder, date)
+            # 2025_02_15 and 2025_2_15 are the same scan
+            future = scan_executor.submit((main_folder, date_key(date)), timed_extract, main_folder, date)
+            order_data, scan_timings = await asyncio.wrap_future(future)
+            scan_done = datetime.now()
+        except QueueFull as e:
+            logger.warning(f"Rejected extraction of {date}: {str(e)}")
+            raise HTTPException(status_code=503, detail=f"Too many scans in progress, retry later: {str(e)}")
         except Exception as e:
             import traceback
             error_trace = traceback.format_exc()
@@ -270,7 +439,10 @@ def extract_orders(
         if update_sheet and order_data:
             try:
                 logger.info("Starting Google Sheet update")
-                sheet_updated = update_google_sheet(
+                sheet_updated = await run_in_threadpool(
+                    timed_sheets_call,
+                    "update_sheet",
+                    update_google_sheet,
                     DEFAULT_CONFIG["SHEET_KEY"],
                     DEFAULT_CONFIG["SHEET_NAME"],
                     DEFAULT_CONFIG["CREDENTIALS_FILE"],
@@ -282,7 +454,8 @@ def extract_orders(
                 logger.error(f"Error updating Google Sheet: {sheet_error}")
 
         # Calculate processing time
-        processing_time = (datetime.now() - start_time).total_seconds()
+        end_time = datetime.now()
+        processing_time = (end_time - start_time).total_seconds()
         logger.info(f"Completed processing in {processing_time:.2f} seconds")
 
         # Prepare response message
@@ -301,6 +474,12 @@ def extract_orders(
             order_list=order_list,
             message=message
         )
+        if timings:
+            # A request that joined a scan already in flight reports the timings of that scan
+            result.timings = dict(scan_timings,
+                                  wait_for_scan=(scan_done - start_time).total_seconds(),
+                                  sheet_update=(end_time - scan_done).total_seconds(),
+                                  total=processing_time)
         logger.info(f"Returning result: {message}")
         return result
 
@@ -314,6 +493,151 @@ def extract_orders(
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}\nDetails: {error_details}")
 
 
+@app.get("/orders/search", tags=["Orders"])
+def search_orders(q: str = Query(..., min_length=1, description="Part of an order code, case-insensitive"),
+                  limit: int = Query(50, ge=1, le=500, description="Maximum number of order codes returned")):
+    """Order codes containing q, with the machine, date, batch folder and path of each of their files"""
+    index = get_lookup_index()
+    codes = index.search(q, limit)
+    logger.info(f"Order search {q!r}: {len(codes)} codes")
+    return {
+        "query": q,
+        "total": len(codes),
+        "orders": [{"order_code": code, "locations": index.find(code)} for code in codes],
+        **lookup_sources()
+    }
+
+
+@app.get("/orders/{code}", tags=["Orders"])
+def find_order(code: str):
+    """Where the files of an order code are: machine, date, batch folder and path in FlashPOD and BackupFlashPOD"""
+    locations = get_lookup_index().find(code)
+    if not locations:
+        detail = f"Order code not found in {', '.join(lookup_roots())}: {code}"
+        raise HTTPException(status_code=404, detail=detail)
+    return {"order_code": code, "total_files": len(locations), "locations": locations, **lookup_sources()}
+
+
+@app.get("/extract/range", tags=["Extraction"])
+def extract_orders_range(
+        date_from: str = Query(..., alias="from", description="First date in YYYY_M_D format (e.g., 2025_2_1)"),
+        date_to: str = Query(..., alias="to", description="Last date in YYYY_M_D format (e.g., 2025_2_28)")):
+    """Stream the order codes of every date in a range as NDJSON, one date is sent as soon as it is scanned"""
+    logger.info(f"Request to extract order codes from {date_from} to {date_to}")
+    try:
+        dates = date_range(date_from, date_to, MAX_RANGE_DAYS)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    main_folder = DEFAULT_CONFIG["MAIN_FOLDER"]
+    if not os.path.exists(main_folder):
+        logger.error(f"Main folder does not exist: {main_folder}")
+        raise HTTPException(status_code=400, detail=f"Main folder does not exist: {main_folder}")
+
+    def scan_date(target_date):
+        # Range requests wait for a slot instead of being rejected half way through the stream
+        future = scan_executor.submit((main_folder, date_key(target_date)), timed_extract, main_folder, target_date,
+                                      reject_when_full=False)
+        return future.result()[0]
+
+    def generate():
+        start_time = datetime.now()
+        total = 0
+        # Only a few dates are held in memory at once, whatever the length of the range
+        for target_date, order_data in iter_parallel(dates, scan_date, RANGE_WORKERS):
+            for code, seller in order_data:
+                yield DatedOrderCode(order_code=code, seller=seller, date=target_date).model_dump_json() + "\n"
+            total += len(order_data)
+        processing_time = (datetime.now() - start_time).total_seconds()
+        logger.info(f"Streamed {total} order codes for {len(dates)} dates in {processing_time:.2f} seconds")
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+
+@app.get("/diff", tags=["Extraction"])
+def diff_orders(date: str = Query(..., description="Date in YYYY_M_D format (e.g., 2025_2_15)"),
+                since: Optional[int] = Query(None, description="Snapshot id to compare with, defaults to the latest")):
+    """PDFs added and removed in the date folders since a stored snapshot, the current state is stored too"""
+    logger.info(f"Request to diff {date} since snapshot {since}")
+    main_folder = DEFAULT_CONFIG["MAIN_FOLDER"]
+    if not os.path.exists(main_folder):
+        logger.error(f"Main folder does not exist: {main_folder}")
+        raise HTTPException(status_code=400, detail=f"Main folder does not exist: {main_folder}")
+
+    store = get_snapshot_store()
+    latest = store.load(main_folder, date)
+    previous = latest if since is None else store.load(main_folder, date, since)
+    if since is not None and previous is None:
+        raise HTTPException(status_code=404, detail=f"No snapshot {since} for date {date}")
+
+    tree = snapshot_date(main_folder, date)
+    # Do not store the same state twice, reruns without changes keep pointing at one snapshot
+    if latest is not None and latest[2]["hash"] == tree["hash"]:
+        snapshot_id = latest[0]
+    else:
+        snapshot_id = store.save(main_folder, date, tree)
+
+    added, removed = diff_trees(previous[2] if previous else None, tree)
+    logger.info(f"Diff of {date}: {len(added)} PDFs added, {len(removed)} removed")
+    return {
+        "date": date,
+        "snapshot_id": snapshot_id,
+        "since": previous[0] if previous else None,
+        "since_created": datetime.fromtimestamp(previous[1]).isoformat() if previous else None,
+        "total_added": len(added),
+        "total_removed": len(removed),
+        "added": added,
+        "removed": removed
+    }
+
+
+# Build the order table of a date range from the order index
+def build_order_table(main_folder: str, dates: List[str]) -> OrderTable:
+    if not os.path.exists(main_folder):
+        logger.error(f"Main folder does not exist: {main_folder}")
+        raise HTTPException(status_code=400, detail=f"Main folder does not exist: {main_folder}")
+
+    index = get_order_index(main_folder)
+    records = []
+    for target_date in dates:
+        index.refresh(target_date)
+        records.extend(order_records(target_date, index.get_pdfs(target_date)))
+    logger.info(f"Built order table with {len(records)} files for {len(dates)} dates")
+    return OrderTable.from_records(records)
+
+
+@app.get("/stats", tags=["Extraction"])
+def get_order_stats(
+        date_from: str = Query(..., description="First date in YYYY_M_D format (e.g., 2025_2_1)"),
+        date_to: Optional[str] = Query(None, description="Last date in YYYY_M_D format, defaults to date_from"),
+        group_by: str = Query("seller", description="Comma separated columns to group by: " + ", ".join(COLUMNS)),
+        seller: Optional[str] = Query(None, description="Only count orders of this seller"),
+        machine: Optional[str] = Query(None, description="Only count orders of this machine folder"),
+        product_type: Optional[str] = Query(None, description="Only count orders of this product type")):
+    """Count order files and distinct order codes per group over a date range"""
+    logger.info(f"Request for order stats from {date_from} to {date_to}, group by {group_by}")
+    columns = list(dict.fromkeys(column.strip() for column in group_by.split(",") if column.strip()))
+    unknown = [column for column in columns if column not in COLUMNS]
+    if not columns or unknown:
+        raise HTTPException(status_code=400, detail=f"Invalid group_by columns: {unknown or group_by}")
+    try:
+        dates = date_range(date_from, date_to or date_from, MAX_RANGE_DAYS)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    table = build_order_table(DEFAULT_CONFIG["MAIN_FOLDER"], dates)
+    table = table.filter(seller=seller, machine=machine, product_type=product_type)
+    groups = table.count_by(columns)
+    return {
+        "date_from": dates[0],
+        "date_to": dates[-1],
+        "total_files": len(table),
+        "total_orders": table.count_distinct("order_code"),
+        "group_by": columns,
+        "groups": groups
+    }
+
+
 @app.post("/config", tags=["Configuration"])
 def update_configuration(config: UpdateConfig):
     """Update API configuration parameters"""
@@ -345,6 +669,16 @@ def update_configuration(config: UpdateConfig):
                 logger.error(f"Invalid folder path: {config.folder_path}")
                 raise HTTPException(status_code=400, detail="Invalid folder path")
 
+        if config.backup_folder_path:
+            if os.path.isdir(config.backup_folder_path):
+                old_value = DEFAULT_CONFIG["BACKUP_FOLDER"]
+                DEFAULT_CONFIG["BACKUP_FOLDER"] = config.backup_folder_path
+                changes.append(f"Backup folder: {old_value} -> {config.backup_folder_path}")
+                updated = True
+            else:
+                logger.error(f"Invalid backup folder path: {config.backup_folder_path}")
+                raise HTTPException(status_code=400, detail="Invalid backup folder path")
+
         if config.credentials_file:
             # Skip file check if 'string' (for testing)
             if config.credentials_file == "string" or os.path.isfile(config.credentials_file):
@@ -371,70 +705,145 @@ def update_configuration(config: UpdateConfig):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/metrics", response_class=PlainTextResponse, tags=["Debugging"])
+def get_metrics():
+    """Scan, cache and Google Sheets metrics in the Prometheus text format"""
+    cache_stats = result_cache.stats()
+    for name in ("entries", "pinned_entries", "hits", "pinned_hits", "misses", "evictions"):
+        metrics.set("result_cache", cache_stats[name], stat=name)
+    metrics.set("result_cache_hit_ratio", cache_stats["hit_rate"])
+    for name, value in scan_executor.stats().items():
+        metrics.set("scan_executor", value, stat=name)
+    lookup_stats = order_lookup.stats()
+    if lookup_stats["index"] is not None:
+        metrics.set("order_lookup", lookup_stats["index"]["codes"], stat="codes")
+        metrics.set("order_lookup", lookup_stats["index_age_seconds"], stat="index_age_seconds")
+    metrics.set("order_lookup", int(lookup_stats["building"]), stat="building")
+    metrics.set("order_lookup", lookup_stats["build_failures"], stat="build_failures")
+    # Age of the last failed build, -1 once a build succeeded again
+    metrics.set("order_lookup", lookup_stats["last_error_age_seconds"] if lookup_stats["last_error"] else -1,
+                stat="last_error_age_seconds")
+    return metrics.render()
+
+
+@app.get("/debug/cache", tags=["Debugging"])
+def get_cache_stats():
+    """Counters of the extraction result cache, the scan executor and the order lookup index"""
+    return {"result_cache": result_cache.stats(), "scan_executor": scan_executor.stats(),
+            "order_lookup": order_lookup.stats()}
+
+
 @app.get("/debug/folder", tags=["Debugging"])
-def check_folder(date: str = Query(..., description="Date to check in YYYY_M_D or YYYY_MM_DD format")):
-    logger.info(f"Request to check folder for date: {date}")
+def check_folder(date: str = Query(..., description="Date to check in YYYY_M_D or YYYY_MM_DD format"),
+                 limit: int = Query(20, ge=1, le=200, description="Machine folders per page"),
+                 cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+                 contents: bool = Query(False, description="List what is inside the date folders instead of only counting the batches")):
+    """Date folders of each machine, a page of machines at a time"""
+    logger.info(f"Request to check folder for date: {date} (limit {limit}, cursor {cursor})")
     main_folder = DEFAULT_CONFIG["MAIN_FOLDER"]
     result = {
         "main_folder_exists": os.path.exists(main_folder),
         "main_folder_path": main_folder,
         "date": date,
+        "total_machines": 0,
         "machine_folder_list": [],
+        "next_cursor": None,
     }
 
     if result["main_folder_exists"]:
-        logger.info(f"Main folder exists: {main_folder}")
-        for machine_folder in os.listdir(main_folder):
-            machine_path = os.path.join(main_folder, machine_folder)
-            if os.path.isdir(machine_path):
-                logger.debug(f"Checking machine folder: {machine_folder}")
-                machine_info = {
-                    "name": machine_folder,
-                    "path": machine_path,
-                    "month_folder_list": []
-                }
-
-                for month_folder in os.listdir(machine_path):
-                    month_path = os.path.join(machine_path, month_folder)
-                    if os.path.isdir(month_path):
-                        logger.debug(f"Checking month folder: {month_folder}")
-                        # Try both date formats
-                        parts = date.split("_")
-                        date_formats = [date]
-
-                        if len(parts) == 3:
-                            year, month, day = parts
-                            # Add format without leading zeros
-                            alternative_format = f"{year}_{int(month)}_{int(day)}"
-                            if alternative_format != date:
-                                date_formats.append(alternative_format)
-
-                        month_info = {
-                            "name": month_folder,
-                            "path": month_path,
-                            "checked_date_formats": date_formats
-                        }
-
-                        for format in date_formats:
-                            date_path = os.path.join(month_path, format)
-                            exists = os.path.exists(date_path)
-                            month_info[f"date_folder_{format}_exists"] = exists
-                            month_info[f"date_folder_{format}_path"] = date_path
-
-                            if exists:
-                                logger.info(f"Found date folder: {date_path}")
-                                month_info["contents"] = os.listdir(date_path)
-
-                        machine_info["month_folder_list"].append(month_info)
-
-                result["machine_folder_list"].append(machine_info)
+        # The index refresh is the slow part, pages requested shortly after each other share it
+        machines = debug_folder_cache.get((os.path.normpath(main_folder), date),
+                                          lambda: build_folder_check(main_folder, date))
+        names = sorted(machines)
+        start = bisect_right(names, cursor) if cursor else 0
+        page = names[start:start + limit]
+        result["total_machines"] = len(names)
+        for name in page:
+            machine_info = dict(machines[name])
+            if contents:
+                # Everything in the date folders like a plain listing, files included, the index only keeps batches
+                machine_info["month_folder_list"] = [dict(month) for month in machine_info["month_folder_list"]]
+                for month in machine_info["month_folder_list"]:
+                    for format in month["checked_date_formats"]:
+                        if month[f"date_folder_{format}_exists"]:
+                            children, _, _ = folder_tree.listing(month[f"date_folder_{format}_path"])
+                            month["contents"] = month.get("contents", []) + [child for child, _ in children]
+            result["machine_folder_list"].append(machine_info)
+        if start + limit < len(names) and page:
+            result["next_cursor"] = page[-1]
     else:
         logger.warning(f"Main folder does not exist: {main_folder}")
 
-    logger.info(f"Folder check result: {len(result['machine_folder_list'])} machines found")
+    logger.info(f"Folder check result: {len(result['machine_folder_list'])} of {result['total_machines']} machines")
     return result
 
 
+# Build the date folder check of every machine from the folder listings and the order index
+def build_folder_check(main_folder: str, date: str):
+    logger.info(f"Main folder exists: {main_folder}")
+    index = get_order_index(main_folder)
+    index.refresh(date)
+    formats = date_formats(date)
+    found = {(folder["machine"], folder["month"], folder["date"]): folder
+             for folder in index.get_date_folders(date)}
+
+    # Months come from the machine folders like a plain listing, the index only knows the months of dates it was asked for
+    machines = {}
+    machine_children, _, _ = folder_tree.listing(main_folder)
+    for machine_folder in [name for name, is_dir in machine_children if is_dir]:
+        machine_path = os.path.join(main_folder, machine_folder)
+        machine_info = {
+            "name": machine_folder,
+            "path": machine_path,
+            "month_folder_list": []
+        }
+
+        month_children, _, _ = folder_tree.listing(machine_path)
+        for month_folder in [name for name, is_dir in month_children if is_dir]:
+            month_path = os.path.join(machine_path, month_folder)
+            month_info = {
+                "name": month_folder,
+                "path": month_path,
+                "checked_date_formats": formats,
+                "batch_count": 0
+            }
+            date_children, _, _ = folder_tree.listing(month_path)
+            date_folders = {name for name, is_dir in date_children if is_dir}
+
+            for format in formats:
+                date_path = os.path.join(month_path, format)
+                exists = format in date_folders
+                month_info[f"date_folder_{format}_exists"] = exists
+                month_info[f"date_folder_{format}_path"] = date_path
+
+                if exists:
+                    logger.info(f"Found date folder: {date_path}")
+                    folder = found.get((machine_folder, month_folder, format))
+                    # A date folder in a month the index does not cover yet is counted from its listing
+                    month_info["batch_count"] += (len(folder["batches"]) if folder is not None
+                                                  else folder_tree.listing(date_path)[1])
+
+            machine_info["month_folder_list"].append(month_info)
+
+        machines[machine_folder] = machine_info
+    return machines
+
+
+@app.get("/debug/tree", tags=["Debugging"])
+def browse_folder(path: str = Query("", description="Folder relative to the main folder, empty for the main folder"),
+                  limit: int = Query(50, ge=1, le=500, description="Children per page"),
+                  cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+                  counts: bool = Query(True, description="Count the children of every sub folder on the page")):
+    """Expand one level of the folder tree, children sorted by name"""
+    logger.info(f"Request to browse folder: {path!r} (limit {limit}, cursor {cursor})")
+    try:
+        return folder_tree.page(DEFAULT_CONFIG["MAIN_FOLDER"], path, limit, cursor, counts)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
 if __name__ == "__main__":
     import uvicorn
 
@@ -445,5 +854,9 @@ if __name__ == "__main__":
         sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
         sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
 
+    # Keep today's orders in memory from file system events: python order_code_api.py --watch
+    if "--watch" in sys.argv:
+        DEFAULT_CONFIG["WATCH_MODE"] = True
+
     logger.info("Application is starting...")
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
@@ -0,0 +1,327 @@
+import os
+import sqlite3
+import hashlib
+import time
+import logging
+import threading
+
+from folder_scanner import MAX_WORKERS, list_folder, scan_parallel
+from order_parser import parse_order
+from path_resolver import date_formats, resolver, split_date
+
+logger = logging.getLogger("order_index")
+
+INDEX_FILE = "order_index.db"
+# Index files live next to the code, not in whatever folder a script was started from
+INDEX_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Depth of each folder level below the main folder:
+# <main>/<Machine N>/<YYYY_M>/<YYYY_M_D>/<batch>/*.pdf
+LEVEL_MAIN = 0
+LEVEL_MACHINE = 1
+LEVEL_MONTH = 2
+LEVEL_DATE = 3
+LEVEL_BATCH = 4
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS folders (
+    path TEXT PRIMARY KEY,
+    parent TEXT,
+    name TEXT NOT NULL,
+    level INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    machine TEXT,
+    month TEXT,
+    date TEXT
+);
+CREATE INDEX IF NOT EXISTS folders_parent ON folders(parent);
+CREATE INDEX IF NOT EXISTS folders_date ON folders(level, date);
+CREATE TABLE IF NOT EXISTS pdfs (
+    folder TEXT NOT NULL,
+    name TEXT NOT NULL,
+    machine TEXT NOT NULL,
+    month TEXT NOT NULL,
+    date TEXT NOT NULL,
+    batch TEXT NOT NULL,
+    order_code TEXT,
+    seller TEXT,
+    PRIMARY KEY (folder, name)
+);
+CREATE INDEX IF NOT EXISTS pdfs_date ON pdfs(date);
+"""
+
+
+def index_file_for(main_folder):
+    """Return the default index file of a main folder, one per folder so scripts with
+    different main folders do not reset each other's index"""
+    key = hashlib.sha1(os.path.normcase(os.path.abspath(main_folder)).encode("utf-8")).hexdigest()[:12]
+    name, ext = os.path.splitext(INDEX_FILE)
+    return os.path.join(INDEX_DIR, f"{name}_{key}{ext}")
+
+
+def _child_keys(keys, level, name):
+    child_keys = dict(keys)
+    child_keys[("machine", "month", "date", "batch")[level]] = name
+    return child_keys
+
+
+def _subtree_bounds(path):
+    # All descendants of `path` sort between "path<sep>" and "path<sep+1>"
+    return path + os.sep, path + chr(ord(os.sep) + 1)
+
+
+class _Snapshot:
+    # Read-only view of the stored folders shared by the refresh workers
+    def __init__(self):
+        self.mtimes = {}
+        self.children = {}
+        self.dates = {}
+
+
+class _Changes:
+    # Rows collected by one refresh worker, written to the database by the calling thread
+    def __init__(self):
+        self.folders = []
+        self.listed = []
+        self.dropped = []
+        self.placeholders = []
+        self.pdfs = []
+        self.checked = 0
+        self.scanned = 0
+        self.files = 0
+        self.seconds = 0.0
+
+
+def _sync_folder(path, parent, level, keys, names, snapshot, changes):
+    # Compare one folder with the snapshot, return the (path, parent, level, keys) of children to visit
+    try:
+        mtime_ns = os.stat(path).st_mtime_ns
+    except OSError:
+        changes.dropped.append(path)
+        return []
+    changes.checked += 1
+
+    if snapshot.mtimes.get(path) == mtime_ns:
+        children = snapshot.children.get(path, [])
+    else:
+        changes.scanned += 1
+        dirs, files = list_folder(path)
+        children = [entry.name for entry in dirs]
+        changes.folders.append((path, parent, os.path.basename(path), level, mtime_ns,
+                                keys.get("machine"), keys.get("month"), keys.get("date")))
+        if level == LEVEL_BATCH:
+            rows = []
+            for entry in files:
+                if not entry.name.lower().endswith(".pdf"):
+                    continue
+                order = parse_order(entry.name)
+                order_code, seller = order.key if order else (None, None)
+                rows.append((path, entry.name, keys["machine"], keys["month"], keys["date"], keys["batch"],
+                             order_code, seller))
+            changes.pdfs.append((path, rows))
+            changes.files += len(rows)
+        else:
+            changes.listed.append((path, level, keys, children))
+
+    if level == LEVEL_BATCH:
+        return []
+    return [(os.path.join(path, name), path, level + 1, _child_keys(keys, level, name))
+            for name in children
+            if not (level + 1 == LEVEL_DATE and names is not None and name not in names)]
+
+
+def _probe_date_folders(machine, target_date, snapshot, changes):
+    # Resolve the date folders of one machine directly, return them as folders to visit
+    path, _, _, keys = machine
+    date_paths = resolver.date_folders(path, target_date)
+    pending = []
+    for date_path in date_paths:
+        month_path = os.path.dirname(date_path)
+        month_keys = _child_keys(keys, LEVEL_MACHINE, os.path.basename(month_path))
+        changes.placeholders.append((month_path, path, month_keys["month"], LEVEL_MONTH, -1,
+                                     month_keys["machine"], month_keys["month"], None))
+        pending.append((date_path, month_path, LEVEL_DATE,
+                        _child_keys(month_keys, LEVEL_MONTH, os.path.basename(date_path))))
+
+    # Date folders indexed before, also under another month folder than the date's own (a full
+    # refresh found them there): visit them while they exist, forget them once they are gone
+    for known in snapshot.dates.get(path, []):
+        if known in date_paths:
+            continue
+        if os.path.isdir(known):
+            month_path = os.path.dirname(known)
+            month_keys = _child_keys(keys, LEVEL_MACHINE, os.path.basename(month_path))
+            pending.append((known, month_path, LEVEL_DATE, _child_keys(month_keys, LEVEL_MONTH, os.path.basename(known))))
+        else:
+            changes.dropped.append(known)
+    return pending
+
+
+class OrderIndex:
+    """Persistent SQLite index of machine/month/date/batch folders and the PDFs inside them.
+
+    A refresh only lists directories whose mtime changed since the last refresh,
+    unchanged directories are answered from the stored rows.
+    """
+
+    def __init__(self, main_folder, index_file=None):
+        self.main_folder = os.path.normpath(main_folder)
+        self.index_file = index_file or index_file_for(main_folder)
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._conn = sqlite3.connect(self.index_file, check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+        self._reset_if_moved()
+
+    def _reset_if_moved(self):
+        # The index belongs to one main folder, start over if it was pointed elsewhere
+        row = self._conn.execute("SELECT value FROM meta WHERE key = 'main_folder'").fetchone()
+        if row is not None and row[0] == self.main_folder:
+            return
+        with self._conn:
+            self._conn.execute("DELETE FROM folders")
+            self._conn.execute("DELETE FROM pdfs")
+            self._conn.execute("INSERT OR REPLACE INTO meta VALUES ('main_folder', ?)", (self.main_folder,))
+        logger.info(f"Created new order index for {self.main_folder} in {self.index_file}")
+
+    def close(self):
+        self._conn.close()
+
+    def refresh(self, target_date=None, max_workers=MAX_WORKERS):
+        """Bring the index up to date with the folder tree.
+
+        With a target_date only the matching date folders are descended into.
+        Machine folders are checked in parallel and their changes written in one transaction.
+        Returns a dict with the number of directories checked and listed and PDFs read,
+        in total and per machine folder with the time each machine took.
+        """
+        # One refresh at a time: a refresh drops the children missing from its own listings, so an
+        # overlapping refresh could otherwise delete folders the other one just added
+        with self._refresh_lock:
+            return self._refresh(target_date, max_workers)
+
+    def _refresh(self, target_date, max_workers):
+        names = set(date_formats(target_date)) if target_date else None
+        # Dates in YYYY_M_D form go straight to their month folder instead of walking every month
+        probe = target_date is not None and split_date(target_date) is not None
+        with self._lock:
+            snapshot = self._load_snapshot(names)
+
+        # The file system work runs without the lock so readers are not blocked meanwhile.
+        # Each folder is stat'ed before it is listed, so a change racing a refresh leaves an
+        # older mtime behind and the folder is listed again next time.
+        changes = _Changes()
+        machines = _sync_folder(self.main_folder, None, LEVEL_MAIN, {}, names, snapshot, changes)
+
+        def sync_machine(machine):
+            start = time.perf_counter()
+            machine_changes = _Changes()
+            if probe:
+                pending = _probe_date_folders(machine, target_date, snapshot, machine_changes)
+            else:
+                pending = [machine]
+            while pending:
+                pending.extend(_sync_folder(*pending.pop(), names, snapshot, machine_changes))
+            machine_changes.seconds = time.perf_counter() - start
+            return machine_changes
+
+        machine_changes = scan_parallel(machines, sync_machine, max_workers)
+        all_changes = [changes] + machine_changes
+        with self._lock, self._conn:
+            for item in all_changes:
+                self._apply(item)
+
+        stats = {"checked": sum(item.checked for item in all_changes),
+                 "listed": sum(item.scanned for item in all_changes),
+                 "files": sum(item.files for item in all_changes),
+                 "machines": {os.path.basename(machine[0]): {"seconds": item.seconds, "checked": item.checked,
+                                                             "listed": item.scanned, "files": item.files}
+                              for machine, item in zip(machines, machine_changes)}}
+        logger.info(f"Order index refreshed: {stats['checked']} folders checked, {stats['listed']} listed")
+        return stats
+
+    def _load_snapshot(self, names):
+        # Stored mtimes and children of every folder this refresh can reach
+        query = "SELECT path, parent, name, mtime_ns FROM folders"
+        params = []
+        if names is not None:
+            query += " WHERE level <= ? UNION ALL %s WHERE level IN (?, ?) AND date IN (%s)" % (
+                query, ",".join("?" * len(names)))
+            params = [LEVEL_MONTH, LEVEL_DATE, LEVEL_BATCH] + sorted(names)
+        snapshot = _Snapshot()
+        for path, parent, name, mtime_ns in self._conn.execute(query, params):
+            snapshot.mtimes[path] = mtime_ns
+            snapshot.children.setdefault(parent, []).append(name)
+            if names is not None and name in names:
+                snapshot.dates.setdefault(os.path.dirname(parent), []).append(path)
+        return snapshot
+
+    def _apply(self, changes):
+        for path in changes.dropped:
+            self._drop_folder(path)
+
+        for path, level, keys, dirs in changes.listed:
+            # Forget child folders that were removed since the last scan
+            current = set(dirs)
+            for (name,) in self._conn.execute("SELECT name FROM folders WHERE parent = ?", (path,)).fetchall():
+                if name not in current:
+                    self._drop_folder(os.path.join(path, name))
+
+            # Record new child folders with an unknown mtime so a later refresh lists them,
+            # even when this refresh skips them because they belong to another date
+            rows = []
+            for name in dirs:
+                child_keys = _child_keys(keys, level, name)
+                rows.append((os.path.join(path, name), path, name, level + 1, -1,
+                             child_keys.get("machine"), child_keys.get("month"), child_keys.get("date")))
+            self._conn.executemany("INSERT OR IGNORE INTO folders VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+        self._conn.executemany("INSERT OR IGNORE INTO folders VALUES (?, ?, ?, ?, ?, ?, ?, ?)", changes.placeholders)
+        self._conn.executemany("INSERT OR REPLACE INTO folders VALUES (?, ?, ?, ?, ?, ?, ?, ?)", changes.folders)
+
+        for path, rows in changes.pdfs:
+            self._conn.execute("DELETE FROM pdfs WHERE folder = ?", (path,))
+            self._conn.executemany("INSERT INTO pdfs VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def _drop_folder(self, path):
+        low, high = _subtree_bounds(path)
+        self._conn.execute("DELETE FROM folders WHERE path = ? OR (path >= ? AND path < ?)", (path, low, high))
+        self._conn.execute("DELETE FROM pdfs WHERE folder = ? OR (folder >= ? AND folder < ?)", (path, low, high))
+
+    def get_orders(self, target_date):
+        """Return the set of unique (order_code, seller) for a date"""
+        formats = date_formats(target_date)
+        query = ("SELECT DISTINCT order_code, seller FROM pdfs WHERE order_code IS NOT NULL AND date IN (%s)"
+                 % ",".join("?" * len(formats)))
+        with self._lock:
+            return set(self._conn.execute(query, formats).fetchall())
+
+    def get_pdfs(self, target_date, machine=None):
+        """Return (machine, batch, file name, folder path) rows of every PDF for a date"""
+        formats = date_formats(target_date)
+        query = "SELECT machine, batch, name, folder FROM pdfs WHERE date IN (%s)" % ",".join("?" * len(formats))
+        params = list(formats)
+        if machine is not None:
+            query += " AND machine = ?"
+            params.append(machine)
+        with self._lock:
+            return self._conn.execute(query + " ORDER BY machine, batch, name", params).fetchall()
+
+    def get_date_folders(self, target_date):
+        """Return the indexed date folders for a date with the batch folders inside each"""
+        formats = date_formats(target_date)
+        query = ("SELECT path, machine, month, name FROM folders WHERE level = ? AND name IN (%s) ORDER BY path"
+                 % ",".join("?" * len(formats)))
+        with self._lock:
+            folders = self._conn.execute(query, [LEVEL_DATE] + formats).fetchall()
+            result = []
+            for path, machine, month, name in folders:
+                batches = [batch for (batch,) in self._conn.execute(
+                    "SELECT name FROM folders WHERE parent = ? ORDER BY name", (path,))]
+                result.append({"path": path, "machine": machine, "month": month, "date": name,
+                               "batches": batches})
+            return result
@@ -0,0 +1,187 @@
+import os
+import time
+import logging
+import threading
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
+
+from folder_scanner import MAX_WORKERS, machine_folders, scan_parallel, walk_files
+from order_parser import parse_order
+from path_resolver import split_date
+
+logger = logging.getLogger("order_lookup")
+
+# Seconds an index is served before it is rebuilt in the background
+REFRESH_SECONDS = 300
+
+
+def _location(source, root, path):
+    # FlashPOD is <machine>/<month>/<date>/<batch>, BackupFlashPOD <machine>/<date>/<batch>
+    parts = os.path.relpath(path, root).split(os.sep)
+    folders = parts[:-1]
+    date = next((part for part in folders[1:] if split_date(part) is not None), None)
+    return {
+        "source": source,
+        "machine": folders[0] if folders else None,
+        "date": date,
+        "batch": folders[-1] if len(folders) > 1 else None,
+        "path": path,
+    }
+
+
+class LookupIndex:
+    """Read-only index of order codes: a dict for exact lookups, a trigram index for substrings.
+
+    Codes are matched case-insensitively. Queries shorter than three characters use a
+    prefix search on the sorted codes instead of the trigrams.
+    """
+
+    def __init__(self, records):
+        locations = {}
+        for code, seller, location in records:
+            locations.setdefault(code.upper(), []).append(dict(location, order_code=code, seller=seller))
+        self.codes = sorted(locations)
+        self.locations = locations
+        self.trigrams = {}
+        for i, code in enumerate(self.codes):
+            for j in range(len(code) - 2):
+                self.trigrams.setdefault(code[j:j + 3], set()).add(i)
+        self.built = time.time()
+        self.file_count = len(records)
+
+    def find(self, code):
+        """Return the locations of one order code, empty if it is unknown"""
+        return self.locations.get(code.upper(), [])
+
+    def search(self, query, limit=50):
+        """Return up to limit codes containing the query, sorted"""
+        query = query.upper()
+        if len(query) < 3:
+            start = bisect_left(self.codes, query)
+            matches = []
+            for code in self.codes[start:]:
+                if not code.startswith(query) or len(matches) >= limit:
+                    break
+                matches.append(code)
+            return matches
+
+        postings = [self.trigrams.get(query[j:j + 3]) for j in range(len(query) - 2)]
+        if not all(postings):
+            return []
+        postings.sort(key=len)
+        candidates = set(postings[0]).intersection(*postings[1:])
+        # Trigrams only narrow the candidates down, the full query still has to be checked
+        return [code for code in sorted(self.codes[i] for i in candidates) if query in code][:limit]
+
+    def stats(self):
+        return {"codes": len(self.codes), "files": self.file_count, "trigrams": len(self.trigrams),
+                "built": self.built}
+
+
+def build_lookup_index(roots, max_workers=MAX_WORKERS):
+    """Walk every machine folder of every {source: root} in parallel and index the order PDFs"""
+    folders = [(source, root, machine) for source, root in roots.items() if root and os.path.isdir(root)
+               for machine in machine_folders(root)]
+
+    def scan(folder):
+        source, root, machine = folder
+        records = []
+        for entry in walk_files(machine):
+            order = parse_order(entry.name)
+            if order is not None:
+                records.append((order.order_code, order.seller, _location(source, root, entry.path)))
+        return records
+
+    records = []
+    for machine_records in scan_parallel(folders, scan, max_workers):
+        records.extend(machine_records)
+    index = LookupIndex(records)
+    logger.info(f"Indexed {len(index.codes)} order codes in {len(records)} files of {', '.join(roots)}")
+    return index
+
+
+class IndexBuilding(Exception):
+    """Raised while the first index of a set of roots is still being built"""
+
+
+class OrderLookup:
+    """Keep a LookupIndex of the configured roots, rebuilt in the background once it is older than max_age.
+
+    Builds are single-flight: one walk at a time, started through submit(key, fn, *args)
+    which returns a future (a private one-thread pool if none is given). Requests never
+    walk themselves, until the first index of the roots is ready get() raises IndexBuilding,
+    afterwards stale indexes keep being served while the next one is built. A failed build
+    leaves the last good index in place, its error and time are kept for IndexBuilding and
+    stats().
+    """
+
+    def __init__(self, max_age=REFRESH_SECONDS, submit=None):
+        self.max_age = max_age
+        self._submit = submit
+        self._pool = None
+        self._index = None
+        self._roots = None
+        # Reentrant: a future that is already done runs its callback in the thread adding it
+        self._lock = threading.RLock()
+        self._building = None
+        self._wanted = None
+        self._error = None
+        self.failures = 0
+
+    def get(self, roots):
+        """Return the index of {source: root}, raise IndexBuilding while its first build runs"""
+        roots = dict(roots)
+        with self._lock:
+            self._wanted = roots
+            index = self._index if self._roots == roots else None
+            stale = index is not None and time.time() - index.built > self.max_age
+            if (index is None or stale) and self._building != roots:
+                self._start_build(roots)
+            error = self._error
+        if index is None:
+            message = f"Order lookup index of {', '.join(roots.values()) or 'no folder'} is being built"
+            if error is not None:
+                message += f", the last build failed {time.time() - error[1]:.0f} s ago: {error[0]}"
+            raise IndexBuilding(message)
+        return index
+
+    def _start_build(self, roots):
+        # Called with the lock held
+        self._building = roots
+        if self._submit is not None:
+            key = ("order_lookup",) + tuple(sorted(roots.items()))
+            future = self._submit(key, build_lookup_index, roots)
+        else:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="order-lookup")
+            future = self._pool.submit(build_lookup_index, roots)
+        future.add_done_callback(lambda done: self._built(roots, done))
+
+    def _built(self, roots, future):
+        with self._lock:
+            if self._building == roots:
+                self._building = None
+            try:
+                index = future.result()
+            except Exception as e:
+                # The last good index stays served, the next request past max_age tries again
+                logger.error(f"Error building order lookup index: {str(e)}")
+                self._error = (str(e), time.time())
+                self.failures += 1
+                return
+            self._error = None
+            # A build of roots that were configured away is not served
+            if roots == self._wanted:
+                self._index, self._roots = index, roots
+
+    def stats(self):
+        """Return the served index's stats with its age, whether a build runs and the last build error"""
+        with self._lock:
+            index, building, error = self._index, self._building is not None, self._error
+        now = time.time()
+        return {"index": index.stats() if index is not None else None,
+                "index_age_seconds": round(now - index.built, 1) if index is not None else None,
+                "building": building,
+                "build_failures": self.failures,
+                "last_error": error[0] if error is not None else None,
+                "last_error_age_seconds": round(now - error[1], 1) if error is not None else None}
@@ -0,0 +1,67 @@
+from collections import deque
+
+from folder_scanner import walk_files
+
+
+class CodeMatcher:
+    """Aho-Corasick automaton finding every order code contained in a file name in one pass.
+
+    find(name) returns the same codes as `[code for code in codes if code in name]`,
+    but costs one step per character of the name instead of one search per code.
+    """
+
+    def __init__(self, codes):
+        self.codes = list(dict.fromkeys(code for code in codes if code))
+        goto = [{}]
+        output = [[]]
+        for code in self.codes:
+            node = 0
+            for char in code:
+                next_node = goto[node].get(char)
+                if next_node is None:
+                    next_node = len(goto)
+                    goto[node][char] = next_node
+                    goto.append({})
+                    output.append([])
+                node = next_node
+            output[node].append(code)
+
+        # Breadth first so the fail link of a node is finished before its children need it
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in goto[node].items():
+                queue.append(child)
+                state = fail[node]
+                while state and char not in goto[state]:
+                    state = fail[state]
+                fail[child] = goto[state].get(char, 0)
+                output[child] = output[child] + output[fail[child]]
+
+        self._goto = goto
+        self._fail = fail
+        self._output = output
+
+    def find(self, text):
+        """Return the codes contained in text, each code once, in order of first match"""
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        found = []
+        node = 0
+        for char in text:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if output[node]:
+                found.extend(output[node])
+        return list(dict.fromkeys(found)) if len(found) > 1 else found
+
+
+def find_codes(root, codes, suffix=""):
+    """Walk root once and yield (code, file path) for every code contained in a file name"""
+    matcher = codes if isinstance(codes, CodeMatcher) else CodeMatcher(codes)
+    for entry in walk_files(root, suffix):
+        for code in matcher.find(entry.name):
+            yield code, entry.path
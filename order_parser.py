@@ -0,0 +1,126 @@
+import time
+
+# PDF names have at least 10 tokens separated by "_" or "-":
+#   single: <date>_<side>_<order code>_<size>_<color>_1_<set order>_<seller>_<product type>_<provider>...
+#   set:    <order code>_<side>_<date>_<size>_<color>_<set number>_<set order>_<seller>_<product type>_<provider>...
+# A set number of "1" marks a single order, anything else is part of a set.
+TOKEN_COUNT = 10
+
+# Rush tags that can follow the index of a batch folder, e.g. 01_24H_0107_P2_SET_HOODIE_GILDAN_8
+RUSH_TAGS = ("24H", "EX", "O9")
+
+
+class Order:
+    """One order PDF parsed from its file name"""
+
+    __slots__ = ("name", "date", "side", "order_code", "size", "color", "set_number", "set_order",
+                 "seller", "product_type", "provider")
+
+    def __init__(self, name, date, side, order_code, size, color, set_number, set_order, seller,
+                 product_type, provider):
+        self.name = name
+        self.date = date
+        self.side = side
+        self.order_code = order_code
+        self.size = size
+        self.color = color
+        self.set_number = set_number
+        self.set_order = set_order
+        self.seller = seller
+        self.product_type = product_type
+        self.provider = provider
+
+    @property
+    def is_set(self):
+        return self.set_number != "1"
+
+    @property
+    def key(self):
+        return self.order_code, self.seller
+
+    def __repr__(self):
+        return f"Order({self.order_code!r}, seller={self.seller!r}, name={self.name!r})"
+
+
+class Batch:
+    """One batch folder parsed from its name, e.g. 01_24H_0107_P2_SET_HOODIE_GILDAN_8"""
+
+    __slots__ = ("name", "index", "rush", "day", "printer", "group", "number")
+
+    def __init__(self, name, index, rush, day, printer, group, number):
+        self.name = name
+        self.index = index
+        self.rush = rush
+        self.day = day
+        self.printer = printer
+        self.group = group
+        self.number = number
+
+    def __repr__(self):
+        return f"Batch({self.name!r}, group={self.group!r})"
+
+
+def _tokens(name):
+    # str.replace + str.split measured about twice as fast as an equivalent precompiled regex
+    if name[-4:].lower() == ".pdf":
+        name = name[:-4]
+    return name.replace("-", "_").split("_", TOKEN_COUNT)
+
+
+def parse_order(name):
+    """Parse a PDF file name into an Order, or None if it does not follow the naming rule"""
+    tokens = _tokens(name)
+    if len(tokens) < TOKEN_COUNT:
+        return None
+    first, side, third, size, color, set_number, set_order, seller, product_type, provider = tokens[:TOKEN_COUNT]
+    if set_number == "1":
+        date, order_code = first, third
+    else:
+        order_code, date = first, third
+    return Order(name, date, side, order_code, size, color, set_number, set_order, seller, product_type, provider)
+
+
+def parse_many(names):
+    """Yield an Order for every name in names that follows the naming rule, skipping the others"""
+    for name in names:
+        order = parse_order(name)
+        if order is not None:
+            yield order
+
+
+def parse_batch(name):
+    """Parse a batch folder name, the group is the part between the printer and the batch number"""
+    parts = name.split("_")
+    if len(parts) > 1 and parts[1] in RUSH_TAGS:
+        index, rush, day, printer = (parts + [""] * 4)[:4]
+        group = "_".join(parts[4:-1])
+    else:
+        rush = None
+        index, day, printer = (parts + [""] * 3)[:3]
+        group = "_".join(parts[3:-1])
+    return Batch(name, index, rush, day, printer, group, parts[-1])
+
+
+def benchmark(count=1000000):
+    """Time parse_many against splitting every name by hand"""
+    names = [f"ORD{i}_FRONT_20250301_M_BLACK_{1 + i % 2}_1_SELLER{i % 50}_HOODIE_GILDAN.pdf" for i in range(count)]
+
+    start = time.perf_counter()
+    orders = list(parse_many(names))
+    parser_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    split_orders = []
+    for name in names:
+        parts = name.replace(".pdf", "").replace("-", "_").split("_")
+        if len(parts) > 9:
+            split_orders.append((parts[2] if parts[5] == "1" else parts[0], parts[7]))
+    split_time = time.perf_counter() - start
+
+    assert [order.key for order in orders] == split_orders
+    print(f"parse_many: {count / parser_time:,.0f} names/s ({parser_time:.2f} s)")
+    print(f"str.split : {count / split_time:,.0f} names/s ({split_time:.2f} s)")
+
+
+if __name__ == "__main__":
+    benchmark()
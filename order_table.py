@@ -0,0 +1,103 @@
+import numpy as np
+
+from order_parser import parse_order
+
+COLUMNS = ("date", "machine", "batch", "order_code", "seller", "product_type", "size", "color", "provider")
+
+
+def order_records(date, pdf_rows):
+    """Turn (machine, batch, file name, folder) index rows of a date into OrderTable records"""
+    records = []
+    for machine, batch, name, _ in pdf_rows:
+        order = parse_order(name)
+        if order is not None:
+            records.append((date, machine, batch, order.order_code, order.seller, order.product_type,
+                            order.size, order.color, order.provider))
+    return records
+
+
+class OrderTable:
+    """Columnar, dictionary encoded table of order PDFs.
+
+    Every column is stored as sorted unique values plus an int32 code per row,
+    so filters and group-by counts run on NumPy arrays instead of Python loops.
+    """
+
+    def __init__(self, categories, codes):
+        self.categories = categories
+        self.codes = codes
+
+    @classmethod
+    def from_records(cls, records):
+        """Build a table from tuples in COLUMNS order"""
+        records = list(records)
+        categories = {}
+        codes = {}
+        for i, name in enumerate(COLUMNS):
+            values = np.array([record[i] for record in records], dtype=str)
+            categories[name], inverse = np.unique(values, return_inverse=True)
+            codes[name] = inverse.astype(np.int32).reshape(-1)
+        return cls(categories, codes)
+
+    def __len__(self):
+        return len(self.codes[COLUMNS[0]])
+
+    def column(self, name):
+        """Return the decoded values of a column"""
+        return self.categories[name][self.codes[name]]
+
+    def mask(self, **conditions):
+        """Return a boolean row mask, each condition is a value or a list of values of a column"""
+        mask = np.ones(len(self), dtype=bool)
+        for name, wanted in conditions.items():
+            if wanted is None:
+                continue
+            if isinstance(wanted, str):
+                wanted = [wanted]
+            wanted_codes = np.flatnonzero(np.isin(self.categories[name], wanted))
+            mask &= np.isin(self.codes[name], wanted_codes)
+        return mask
+
+    def filter(self, **conditions):
+        """Return a new table with the rows matching every condition"""
+        mask = self.mask(**conditions)
+        return OrderTable(self.categories, {name: codes[mask] for name, codes in self.codes.items()})
+
+    def _groups(self, columns):
+        # Return (group codes per column, group of each row, rows per group)
+        sizes = [len(self.categories[name]) for name in columns]
+        codes = [self.codes[name] for name in columns]
+        if np.prod(sizes, dtype=float) < np.iinfo(np.int64).max:
+            # One int64 key per row combining the codes of the group columns
+            keys = np.ravel_multi_index(codes, sizes)
+            groups, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+            return np.unravel_index(groups, sizes), inverse.reshape(-1), counts
+        # Too many combinations for one int64 key, find the unique code rows instead
+        groups, inverse, counts = np.unique(np.stack(codes, axis=1), axis=0, return_inverse=True,
+                                            return_counts=True)
+        return groups.T, inverse.reshape(-1), counts
+
+    def count_by(self, columns):
+        """Count files and distinct order codes per group of columns, sorted by file count descending"""
+        if len(self) == 0:
+            return []
+        columns = list(dict.fromkeys(columns))
+        group_codes, inverse, counts = self._groups(columns)
+
+        # Unique (group, order code) pairs, then count the pairs of each group
+        order_count = len(self.categories["order_code"])
+        pairs = np.unique(inverse.astype(np.int64) * order_count + self.codes["order_code"])
+        orders = np.bincount(pairs // order_count, minlength=len(counts))
+
+        order = np.argsort(-counts, kind="stable")
+        result = []
+        for i in order:
+            row = {name: str(self.categories[name][group_codes[j][i]]) for j, name in enumerate(columns)}
+            row["files"] = int(counts[i])
+            row["orders"] = int(orders[i])
+            result.append(row)
+        return result
+
+    def count_distinct(self, name):
+        """Count the distinct values of a column among the rows"""
+        return int(len(np.unique(self.codes[name])))
@@ -0,0 +1,151 @@
+import datetime
+import os
+import threading
+from collections import OrderedDict
+
+MACHINE_PREFIX = "Machine "
+
+
+def split_date(target_date):
+    """Return (year, month, day) ints of a YYYY_M_D / YYYY_MM_DD date, or None if it is not one"""
+    parts = target_date.split("_")
+    if len(parts) != 3:
+        return None
+    try:
+        return tuple(int(part) for part in parts)
+    except ValueError:
+        return None
+
+
+def date_key(target_date):
+    """Return the unpadded YYYY_M_D name of a date so padded and unpadded names share one entry"""
+    date = split_date(target_date)
+    if date is None:
+        return target_date
+    return f"{target_date.split('_')[0]}_{date[1]}_{date[2]}"
+
+
+def date_formats(target_date):
+    """Return the folder names a date can be stored under: as given, without and with leading zeros"""
+    formats = [target_date]
+    date = split_date(target_date)
+    if date is not None:
+        year = target_date.split('_')[0]
+        for alternative_format in (f"{year}_{date[1]}_{date[2]}", f"{year}_{date[1]:02d}_{date[2]:02d}"):
+            if alternative_format not in formats:
+                formats.append(alternative_format)
+    return formats
+
+
+def month_formats(target_date):
+    """Return the month folder names a date can be stored under, e.g. 2025_3 and 2025_03"""
+    date = split_date(target_date)
+    if date is None:
+        return []
+    year = target_date.split("_")[0]
+    formats = [f"{year}_{date[1]}"]
+    if date[1] < 10:
+        formats.append(f"{year}_{date[1]:02d}")
+    return formats
+
+
+def machine_path(main_folder, machine):
+    """Return the folder of a machine given its number or folder name"""
+    if isinstance(machine, int):
+        machine = MACHINE_PREFIX + str(machine)
+    return os.path.join(main_folder, machine)
+
+
+class PathResolver:
+    """Map (machine folder, date) straight to the date folders that exist, without listing month folders.
+
+    The month folder variant found for each machine and month is cached,
+    so later lookups only stat the date folder candidates.
+    """
+
+    def __init__(self, max_size=1024):
+        self.max_size = max_size
+        self._months = OrderedDict()
+        self._lock = threading.Lock()
+
+    def month_folders(self, machine_folder, target_date):
+        """Return the existing month folders of a machine for a date"""
+        formats = month_formats(target_date)
+        if not formats:
+            return []
+        key = (machine_folder, formats[0])
+        with self._lock:
+            cached = self._months.get(key)
+            if cached is not None:
+                self._months.move_to_end(key)
+                return cached
+
+        found = [os.path.join(machine_folder, name) for name in formats
+                 if os.path.isdir(os.path.join(machine_folder, name))]
+        # Only remember hits, a missing month folder may still be created later today
+        if found:
+            with self._lock:
+                self._months[key] = found
+                if len(self._months) > self.max_size:
+                    self._months.popitem(last=False)
+        return found
+
+    def date_folders(self, machine_folder, target_date):
+        """Return the existing date folders of a machine for a date (padded and unpadded names)"""
+        result = []
+        for month_folder in self.month_folders(machine_folder, target_date):
+            for name in date_formats(target_date):
+                path = os.path.join(month_folder, name)
+                if os.path.isdir(path):
+                    result.append(path)
+        return result
+
+    def forget(self, machine_folder=None):
+        """Drop the cached month folders of one machine, or of every machine"""
+        with self._lock:
+            if machine_folder is None:
+                self._months.clear()
+            else:
+                for key in [key for key in self._months if key[0] == machine_folder]:
+                    del self._months[key]
+
+
+# Shared resolver used by the API and the scripts
+resolver = PathResolver()
+
+
+def resolve_date_folders(machine_folder, target_date):
+    """Return the existing date folders of a machine for a date using the shared resolver"""
+    return resolver.date_folders(machine_folder, target_date)
+
+
+def date_range(date_from, date_to, max_days=None):
+    """Return the unpadded YYYY_M_D names of every day from date_from to date_to (inclusive).
+
+    Raises ValueError for malformed dates, for date_to before date_from and for ranges
+    longer than max_days.
+    """
+    start = split_date(date_from)
+    end = split_date(date_to)
+    if start is None or end is None:
+        raise ValueError(f"Dates must be in YYYY_M_D format: {date_from}, {date_to}")
+    day = datetime.date(*start)
+    last = datetime.date(*end)
+    if last < day:
+        raise ValueError(f"Date range ends before it starts: {date_from} - {date_to}")
+    if max_days is not None and (last - day).days + 1 > max_days:
+        raise ValueError(f"Date range is longer than {max_days} days: {date_from} - {date_to}")
+    names = []
+    while day <= last:
+        names.append(f"{day.year}_{day.month}_{day.day}")
+        day += datetime.timedelta(days=1)
+    return names
+
+
+def split_location(main_folder, path):
+    """Return (machine, month, date, batch) folder names of a path below the main folder, None if missing"""
+    parts = os.path.relpath(os.path.dirname(path), main_folder).split(os.sep)
+    if parts == ["."]:
+        parts = []
+    parts = parts[:4] + [None] * (4 - len(parts[:4]))
+    return tuple(parts)
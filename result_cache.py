@@ -0,0 +1,138 @@
+import os
+import logging
+import threading
+from collections import OrderedDict
+from datetime import date
+
+from folder_scanner import list_folder, machine_folders
+from path_resolver import resolver, split_date
+
+logger = logging.getLogger("result_cache")
+
+
+def is_closed_day(target_date):
+    """True if the date is before today, its folders are not expected to change anymore"""
+    parts = split_date(target_date)
+    if parts is None:
+        return False
+    try:
+        return date(*parts) < date.today()
+    except ValueError:
+        return False
+
+
+def folder_signature(folders):
+    """Return the mtimes of the date folders and of the batch folders inside them.
+
+    A new or removed PDF only changes the mtime of its batch folder, so the batch
+    folders have to be part of the signature for it to notice new files.
+    """
+    signature = []
+    for folder in folders:
+        try:
+            signature.append((folder, os.stat(folder).st_mtime_ns))
+        except OSError:
+            signature.append((folder, None))
+            continue
+        dirs, _ = list_folder(folder)
+        for entry in dirs:
+            try:
+                signature.append((entry.path, entry.stat().st_mtime_ns))
+            except OSError:
+                signature.append((entry.path, None))
+    return tuple(sorted(signature))
+
+
+class _Entry:
+    __slots__ = ("signature", "value", "pinned")
+
+    def __init__(self, signature, value, pinned):
+        self.signature = signature
+        self.value = value
+        self.pinned = pinned
+
+
+class ResultCache:
+    """Bounded LRU cache of extraction results keyed by the set of date folders a date resolves to.
+
+    Entries of open days and empty results are checked against the folder mtimes on every
+    hit. Other entries of closed days are pinned: they are trusted without touching the
+    disk and are only evicted once the cache holds nothing but pinned days.
+    """
+
+    def __init__(self, max_size=64):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._pinned_keys = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.pinned_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, main_folder, target_date, compute):
+        """Return the cached result for the date, calling compute() and storing it on a miss"""
+        alias = (os.path.normpath(main_folder), target_date)
+        with self._lock:
+            key = self._pinned_keys.get(alias)
+            entry = self._entries.get(key) if key is not None else None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                self.pinned_hits += 1
+                return entry.value
+
+        folders = []
+        for machine_folder in machine_folders(main_folder):
+            folders.extend(resolver.date_folders(machine_folder, target_date))
+        # A date without folders keeps its own entry instead of sharing the empty set
+        key = frozenset(folders) or alias
+        signature = folder_signature(folders)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.signature == signature:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry.value
+            self.misses += 1
+
+        value = compute()
+        # An empty result may come from a scan that missed the folders, keep checking it
+        pinned = is_closed_day(target_date) and bool(value)
+        with self._lock:
+            self._entries[key] = _Entry(signature, value, pinned)
+            self._entries.move_to_end(key)
+            if pinned:
+                self._pinned_keys[alias] = key
+            while len(self._entries) > self.max_size:
+                self._evict()
+        logger.info(f"Cached result of {target_date} ({len(folders)} date folders, pinned: {pinned})")
+        return value
+
+    def _evict(self):
+        # Least recently used open day first, pinned days only go when nothing else is left
+        old_key = next((key for key, entry in self._entries.items() if not entry.pinned),
+                       next(iter(self._entries)))
+        del self._entries[old_key]
+        self._pinned_keys = {alias: key for alias, key in self._pinned_keys.items() if key != old_key}
+        self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._pinned_keys.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "pinned_entries": sum(1 for entry in self._entries.values() if entry.pinned),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "pinned_hits": self.pinned_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
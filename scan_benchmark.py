@@ -0,0 +1,104 @@
+import os
+import time
+import shutil
+import logging
+import argparse
+import tempfile
+
+import order_code_api
+from bench_timer import timed
+from day_traversal import DayTraversal, PdfCounter
+from farm_generator import generate_farm
+from order_matcher import CodeMatcher, find_codes
+from path_resolver import resolver
+
+
+def reset_caches(index_file):
+    """Drop every in-process cache and the order index, the OS file cache is left as it is"""
+    order_code_api.result_cache.clear()
+    order_code_api.debug_folder_cache.clear()
+    order_code_api.folder_tree.clear()
+    resolver.forget()
+    if order_code_api._order_index is not None:
+        order_code_api._order_index.close()
+        order_code_api._order_index = None
+    if os.path.exists(index_file):
+        os.remove(index_file)
+
+
+def run_benchmarks(root, target_date, codes, repeat=3, lookup_codes=1000):
+    """Time each scan path cold (caches and index dropped) and warm, return [(name, seconds, result size)]"""
+    index_file = os.path.join(root, "benchmark_index.db")
+    order_code_api.DEFAULT_CONFIG.update(MAIN_FOLDER=root, INDEX_FILE=index_file, WATCH_MODE=False)
+    results = []
+
+    def extract():
+        return order_code_api.extract_order_codes(root, target_date)
+
+    def check_folder():
+        return order_code_api.check_folder(date=target_date, limit=200, cursor=None, contents=False)
+
+    def count_pdfs():
+        traversal = DayTraversal(root, target_date)
+        counter = traversal.register(PdfCounter())
+        traversal.run()
+        return counter.result()
+
+    for name, fn, size in (
+            ("extract_order_codes", extract, len),
+            ("check_folder", check_folder, lambda result: result["total_machines"]),
+            ("count_pdfs", count_pdfs, lambda result: sum(result.values()))):
+        reset_caches(index_file)
+        seconds, result = timed(fn)
+        results.append((name + " (cold)", seconds, size(result)))
+        seconds, result = timed(fn, repeat)
+        results.append((name + " (warm)", seconds, size(result)))
+        if fn is extract:
+            # Index kept but result cache dropped: the incremental refresh on its own
+            order_code_api.result_cache.clear()
+            seconds, result = timed(extract)
+            results.append((name + " (index warm, result cache cold)", seconds, size(result)))
+
+    sample = codes[::max(1, len(codes) // lookup_codes)][:lookup_codes]
+    seconds, result = timed(lambda: list(find_codes(root, sample)))
+    results.append((f"find_folder matcher, {len(sample)} codes (cold, builds automaton)", seconds, len(result)))
+    matcher = CodeMatcher(sample)
+    seconds, result = timed(lambda: list(find_codes(root, matcher)), repeat)
+    results.append((f"find_folder matcher, {len(sample)} codes (warm, prebuilt automaton)", seconds, len(result)))
+
+    reset_caches(index_file)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark quét PDF trên cây thư mục giả lập.")
+    parser.add_argument("--root", help="Tạo cây trong folder này và giữ lại sau khi chạy "
+                                       "(mặc định: thư mục tạm, xoá khi xong)")
+    parser.add_argument("--start", default="2025_1_7")
+    parser.add_argument("--days", type=int, default=3)
+    parser.add_argument("--machines", type=int, default=42)
+    parser.add_argument("--batches", type=int, default=4)
+    parser.add_argument("--pdfs", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    # The API logs every request at INFO, keep the benchmark output readable
+    logging.getLogger().setLevel(logging.WARNING)
+
+    root = args.root or tempfile.mkdtemp(prefix="farm_")
+    try:
+        start = time.perf_counter()
+        summary = generate_farm(root, args.start, args.days, args.machines, args.batches, args.pdfs)
+        print(f"Generated {summary['files']} PDFs for {len(summary['dates'])} days in "
+              f"{time.perf_counter() - start:.1f} s: {root}")
+        # The last day is benchmarked, earlier days make the tree as wide as a real month
+        results = run_benchmarks(root, summary["dates"][-1], summary["codes"], args.repeat)
+        width = max(len(name) for name, _, _ in results)
+        for name, seconds, size in results:
+            print(f"{name:<{width}}  {seconds * 1000:10.1f} ms  {size}")
+    finally:
+        if args.root is None:
+            shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
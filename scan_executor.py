@@ -0,0 +1,64 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger("scan_executor")
+
+
+class QueueFull(Exception):
+    """Raised when too many different scans are already waiting or running"""
+
+
+class ScanExecutor:
+    """Run scans on their own bounded thread pool and share one run between identical requests.
+
+    Callers submitting a key that is already in flight get the same future back instead of
+    starting a second scan. New keys are rejected once max_queue scans are in flight, so the
+    web server's own thread pool stays free for the light endpoints.
+    """
+
+    def __init__(self, max_workers=4, max_queue=16):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="scan")
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.coalesced = 0
+        self.rejected = 0
+
+    def submit(self, key, fn, *args, reject_when_full=True):
+        """Return the future of the scan for key, starting fn(*args) only if none is in flight"""
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                logger.info(f"Joined scan already in flight: {key}")
+                return future
+            if reject_when_full and len(self._in_flight) >= self.max_queue:
+                self.rejected += 1
+                raise QueueFull(f"{len(self._in_flight)} scans already in flight")
+            future = self._pool.submit(fn, *args)
+            self._in_flight[key] = future
+            self.submitted += 1
+        future.add_done_callback(lambda done: self._forget(key, done))
+        return future
+
+    def _forget(self, key, future):
+        with self._lock:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "in_flight": len(self._in_flight),
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "submitted": self.submitted,
+                "coalesced": self.coalesced,
+                "rejected": self.rejected,
+            }
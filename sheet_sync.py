@@ -0,0 +1,151 @@
+import os
+import json
+import sqlite3
+import hashlib
+import logging
+import threading
+
+from gspread.utils import rowcol_to_a1
+
+logger = logging.getLogger("sheet_sync")
+
+# Next to the code, so the API and the scripts share the state whatever folder they run from
+SYNC_STATE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sheet_sync.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pushed_sheets (
+    spreadsheet TEXT NOT NULL,
+    sheet TEXT NOT NULL,
+    modified TEXT,
+    rows TEXT NOT NULL,
+    PRIMARY KEY (spreadsheet, sheet)
+);
+"""
+
+
+def _trim(row):
+    # get_all_values pads rows with "" to the widest row, trailing blanks are not content
+    row = list(row)
+    while row and row[-1] == "":
+        row.pop()
+    return row
+
+
+def row_state(row):
+    """Return [hash, width] of a row as kept in the pushed state"""
+    row = _trim(row)
+    return [row_hash(row), len(row)]
+
+
+def row_hash(row):
+    return hashlib.sha1(json.dumps(row, ensure_ascii=False, default=str).encode("utf-8")).hexdigest()
+
+
+def _sheet_key(worksheet):
+    # gspread 6 has spreadsheet_id on the worksheet, older versions only the parent spreadsheet
+    # The sheet id rather than the title, so a sheet deleted and created again starts from a fresh state
+    spreadsheet = getattr(worksheet, "spreadsheet_id", None) or worksheet.spreadsheet.id
+    return spreadsheet, str(worksheet.id)
+
+
+def modified_time(worksheet):
+    """Return the Drive modifiedTime of the worksheet's spreadsheet, None if it cannot be read"""
+    spreadsheet = worksheet.spreadsheet
+    try:
+        if hasattr(spreadsheet, "get_lastUpdateTime"):
+            return spreadsheet.get_lastUpdateTime()
+        return spreadsheet.lastUpdateTime
+    except Exception as e:
+        logger.warning(f"Cannot read the modified time of sheet '{worksheet.title}': {e}")
+        return None
+
+
+def changed_ranges(old_state, rows):
+    """Return [(first row, last row, width)] of the 1-based rows that differ from the pushed state.
+
+    old_state holds [hash, width] per pushed row. Rows that were pushed before but are
+    no longer there count as changed, so they get blanked.
+    """
+    ranges = []
+    for i in range(max(len(old_state), len(rows))):
+        new = rows[i] if i < len(rows) else None
+        old = old_state[i] if i < len(old_state) else None
+        if new is not None and old is not None and old[0] == row_state(new)[0]:
+            continue
+        width = max(len(new) if new is not None else 0, old[1] if old is not None else 0, 1)
+        if ranges and ranges[-1][1] == i:
+            first, _, range_width = ranges[-1]
+            ranges[-1] = (first, i + 1, max(range_width, width))
+        else:
+            ranges.append((i + 1, i + 1, width))
+    return ranges
+
+
+class SheetSync:
+    """Push a matrix to a worksheet by sending only the rows that changed since the last push.
+
+    The hash and width of every pushed row are kept in SQLite, with the spreadsheet's
+    modified time right after the push. A sync compares the new rows with them and writes
+    the changed row ranges in a single batchUpdate, cells of rows that got shorter or
+    disappeared are overwritten with blanks. The sheet is never cleared, so readers do not
+    see it empty half way through.
+    """
+
+    def __init__(self, state_file=SYNC_STATE_FILE):
+        self.state_file = state_file
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(state_file, check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+
+    def close(self):
+        self._conn.close()
+
+    def _load(self, key):
+        with self._lock:
+            row = self._conn.execute("SELECT modified, rows FROM pushed_sheets WHERE spreadsheet = ? AND sheet = ?",
+                                     key).fetchone()
+        return (row[0], json.loads(row[1])) if row is not None else (None, None)
+
+    def _save(self, key, modified, rows):
+        state = [row_state(row) for row in rows]
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO pushed_sheets VALUES (?, ?, ?, ?)",
+                               key + (modified, json.dumps(state)))
+
+    def forget(self, worksheet):
+        """Drop the pushed state of a worksheet, the next sync reads the sheet again"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM pushed_sheets WHERE spreadsheet = ? AND sheet = ?", _sheet_key(worksheet))
+
+    def sync(self, worksheet, rows, force=False):
+        """Make the worksheet hold rows from A1 on, return the number of rows written.
+
+        The pushed state is only trusted while the spreadsheet's modified time is the one
+        saved after the last push. Without a state, when someone else (another script, a
+        person) touched the spreadsheet since, or with force=True, the current values are
+        read from the sheet once and used as the state.
+        """
+        rows = [["" if value is None else value for value in row] for row in rows]
+        key = _sheet_key(worksheet)
+        saved_modified, old_state = (None, None) if force else self._load(key)
+        if old_state is not None and (saved_modified is None or saved_modified != modified_time(worksheet)):
+            logger.info(f"Sheet '{worksheet.title}' changed since the last push, reading it again")
+            old_state = None
+        if old_state is None:
+            old_state = [row_state(row) for row in worksheet.get_all_values()]
+
+        ranges = changed_ranges(old_state, rows)
+        if ranges:
+            data = []
+            for first, last, width in ranges:
+                values = []
+                for i in range(first - 1, last):
+                    row = rows[i] if i < len(rows) else []
+                    values.append(list(row) + [""] * (width - len(row)))
+                data.append({"range": f"{rowcol_to_a1(first, 1)}:{rowcol_to_a1(last, width)}", "values": values})
+            worksheet.batch_update(data, value_input_option="RAW")
+        self._save(key, modified_time(worksheet), rows)
+
+        written = sum(last - first + 1 for first, last, _ in ranges)
+        logger.info(f"Synced sheet '{worksheet.title}': {written} of {len(rows)} rows written in {len(ranges)} ranges")
+        return written
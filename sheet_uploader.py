@@ -0,0 +1,178 @@
+import json
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from gspread.exceptions import APIError, WorksheetNotFound
+from gspread.utils import ValueInputOption, absolute_range_name, rowcol_to_a1
+
+logger = logging.getLogger("sheet_uploader")
+
+# Sheets recommends request bodies under 2 MB, chunks stay well below it
+CHUNK_ROWS = 5000
+CHUNK_BYTES = 1_000_000
+# The write quota is 60 requests per minute per user, leave room for other scripts
+REQUESTS_PER_MINUTE = 50
+RETRIES = 5
+# Responses worth sending the same chunk again for
+RETRY_STATUS = (429, 500, 502, 503, 504)
+
+
+class UploadError(Exception):
+    """Raised when a chunk still fails after its retries, written and failed hold (first, last) row ranges"""
+
+    def __init__(self, message, written, failed):
+        super().__init__(message)
+        self.written = written
+        self.failed = failed
+
+
+def _row_ranges(rows):
+    # Merge sorted (first, last) row pairs that touch into ranges like 1-5000
+    ranges = []
+    for first, last in sorted(rows):
+        if ranges and ranges[-1][1] + 1 >= first:
+            ranges[-1] = (ranges[-1][0], max(ranges[-1][1], last))
+        else:
+            ranges.append((first, last))
+    return ranges
+
+
+def _describe(ranges):
+    return ", ".join(f"{first}-{last}" for first, last in _row_ranges(ranges)) or "none"
+
+
+def split_chunks(rows, chunk_rows=CHUNK_ROWS, chunk_bytes=CHUNK_BYTES):
+    """Return [(first row index, rows)] with at most chunk_rows rows and about chunk_bytes of JSON each"""
+    chunks = []
+    start = 0
+    size = 0
+    for i, row in enumerate(rows):
+        row_size = len(json.dumps(row, ensure_ascii=False, default=str)) + 1
+        if i > start and (i - start >= chunk_rows or size + row_size > chunk_bytes):
+            chunks.append((start, rows[start:i]))
+            start = i
+            size = 0
+        size += row_size
+    if start < len(rows):
+        chunks.append((start, rows[start:]))
+    return chunks
+
+
+def grid_size(worksheet):
+    """Return (rows, columns) of the worksheet as the API has them now.
+
+    Worksheet handles are cached for the life of the process, so their row_count and
+    col_count miss a resize made by someone else.
+    """
+    metadata = worksheet.spreadsheet.fetch_sheet_metadata(params={"fields": "sheets.properties"})
+    for sheet in metadata["sheets"]:
+        if sheet["properties"]["sheetId"] == worksheet.id:
+            grid = sheet["properties"]["gridProperties"]
+            return grid["rowCount"], grid["columnCount"]
+    raise WorksheetNotFound(worksheet.title)
+
+
+def _retryable(error):
+    if isinstance(error, (requests.ConnectionError, requests.Timeout)):
+        return True
+    if isinstance(error, APIError):
+        # gspread 6 has .code, older versions only the response
+        code = getattr(error, "code", None) or getattr(error.response, "status_code", None)
+        return code in RETRY_STATUS
+    return False
+
+
+class RateLimiter:
+    """Space calls evenly so that at most per_minute start in any minute, shared by threads"""
+
+    def __init__(self, per_minute):
+        self.interval = 60.0 / per_minute
+        self._lock = threading.Lock()
+        self._next = 0.0
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+class SheetUploader:
+    """Write a large values matrix to a worksheet in chunks sent in parallel.
+
+    The worksheet is grown once to fit the matrix, then the rows are split into range
+    chunks bounded by row count and payload size. Chunks are written by a thread pool
+    under a shared requests-per-minute limit, and a chunk that fails with a quota,
+    server or connection error is retried on its own with exponential backoff, so one
+    bad response does not restart the whole upload.
+    """
+
+    def __init__(self, max_workers=4, chunk_rows=CHUNK_ROWS, chunk_bytes=CHUNK_BYTES,
+                 requests_per_minute=REQUESTS_PER_MINUTE, retries=RETRIES, backoff=2.0):
+        self.max_workers = max_workers
+        self.chunk_rows = chunk_rows
+        self.chunk_bytes = chunk_bytes
+        self.limiter = RateLimiter(requests_per_minute)
+        self.retries = retries
+        self.backoff = backoff
+
+    def _write_chunk(self, worksheet, start, chunk, value_input_option):
+        range_name = absolute_range_name(worksheet.title, rowcol_to_a1(start + 1, 1))
+        attempt = 0
+        while True:
+            self.limiter.wait()
+            try:
+                worksheet.spreadsheet.values_update(range_name, params={"valueInputOption": value_input_option},
+                                                    body={"values": chunk})
+                return attempt
+            except Exception as e:
+                if attempt >= self.retries or not _retryable(e):
+                    raise
+                delay = self.backoff * 2 ** attempt
+                attempt += 1
+                logger.warning(f"Chunk at row {start + 1} of '{worksheet.title}' failed ({e}), "
+                               f"retry {attempt}/{self.retries} in {delay:.0f} s")
+                time.sleep(delay)
+
+    def upload(self, worksheet, rows, value_input_option=ValueInputOption.user_entered):
+        """Write rows to the worksheet from A1, return {"rows", "chunks", "retries", "seconds", "rows_per_sec"}"""
+        start_time = time.perf_counter()
+        width = max((len(row) for row in rows), default=0)
+        # Grow only, columns next to the data may hold formulas
+        row_count, col_count = grid_size(worksheet)
+        if len(rows) > row_count or width > col_count:
+            worksheet.resize(rows=max(len(rows), row_count), cols=max(width, col_count))
+
+        chunks = split_chunks(rows, self.chunk_rows, self.chunk_bytes)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = [pool.submit(self._write_chunk, worksheet, start, chunk, value_input_option)
+                       for start, chunk in chunks]
+        retries = 0
+        written = []
+        failed = []
+        for (start, chunk), future in zip(chunks, futures):
+            rows_range = (start + 1, start + len(chunk))
+            try:
+                retries += future.result()
+                written.append(rows_range)
+            except Exception as e:
+                failed.append((rows_range, e))
+        if failed:
+            # Chunks that made it stay written, say which rows so a retry or a reader knows what is there
+            not_written = [rows_range for rows_range, _ in failed]
+            (first, last), error = failed[0]
+            raise UploadError(f"Upload to '{worksheet.title}' failed at rows {first}-{last}: {error}. "
+                              f"Rows written: {_describe(written)}; rows not written: {_describe(not_written)}",
+                              _row_ranges(written), _row_ranges(not_written)) from error
+
+        seconds = time.perf_counter() - start_time
+        stats = {"rows": len(rows), "chunks": len(chunks), "retries": retries, "seconds": round(seconds, 3),
+                 "rows_per_sec": round(len(rows) / seconds, 1) if seconds > 0 else 0.0}
+        logger.info(f"Uploaded {stats['rows']} rows to '{worksheet.title}' in {stats['chunks']} chunks, "
+                    f"{stats['seconds']} s ({stats['rows_per_sec']} rows/s, {retries} retries)")
+        return stats
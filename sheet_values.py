@@ -0,0 +1,67 @@
+import math
+import datetime
+
+import numpy as np
+import pandas as pd
+
+DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def _cell(value):
+    """JSON-safe value of one cell of a mixed object column, missing values are already blank"""
+    if isinstance(value, (str, bool, int)):
+        return value
+    if isinstance(value, float):
+        return str(value) if math.isinf(value) else value
+    if isinstance(value, np.generic):
+        return _cell(value.item())
+    if isinstance(value, datetime.datetime):
+        return value.strftime(DATETIME_FORMAT)
+    if isinstance(value, datetime.date):
+        return value.isoformat()
+    return str(value)
+
+
+def column_values(series):
+    """Return the cells of a column as an object array of JSON-safe values.
+
+    Works from the dtype: float columns get NaN blanked and ±inf written as text through
+    NumPy masks, datetimes are formatted in one call, int and bool columns without missing
+    values pass through. Only object columns holding more than strings fall back to a
+    per-cell conversion.
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        series = series.astype(object)
+    kind = series.dtype.kind
+    if kind in "iub" and not series.hasnans:
+        return series.to_numpy().astype(object)
+    if kind == "f":
+        floats = series.to_numpy(dtype=float, na_value=np.nan)
+        values = floats.astype(object)
+        values[np.isnan(floats)] = ""
+        values[np.isposinf(floats)] = "inf"
+        values[np.isneginf(floats)] = "-inf"
+        return values
+    if kind == "M":
+        return series.dt.strftime(DATETIME_FORMAT).fillna("").to_numpy(dtype=object)
+
+    missing = series.isna().to_numpy()
+    values = series.to_numpy(dtype=object).copy()
+    values[missing] = ""
+    if kind == "m":
+        values[~missing] = series[~missing].astype(str).to_numpy(dtype=object)
+    elif pd.api.types.infer_dtype(series, skipna=True) not in ("string", "empty"):
+        present = ~missing
+        values[present] = [_cell(value) for value in values[present]]
+    return values
+
+
+def sheet_values(df, header=True):
+    """Return the DataFrame as a values matrix ready for a Sheets update, header row first"""
+    matrix = np.empty((len(df), len(df.columns)), dtype=object)
+    for i in range(len(df.columns)):
+        matrix[:, i] = column_values(df.iloc[:, i])
+    rows = matrix.tolist()
+    if header:
+        rows.insert(0, [_cell(name) for name in df.columns])
+    return rows